@@ -0,0 +1,179 @@
+"""initial schema
+
+The schema as the app's old startup `Base.metadata.create_all` left it, so a
+database created that way can be adopted with `alembic stamp 0001` and then
+upgraded like any other.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+JOB_SOURCE = postgresql.ENUM(
+    "LINKEDIN", "INDEED", "GLASSDOOR", "ZIPRECRUITER", "MONSTER", "CUSTOM",
+    name="jobsource", create_type=False
+)
+APPLICATION_STATUS = postgresql.ENUM(
+    "PENDING", "IN_PROGRESS", "APPLIED", "FAILED", "REJECTED", "INTERVIEW", "ACCEPTED",
+    name="applicationstatus", create_type=False
+)
+
+
+def _timestamps(updated: bool = True):
+    columns = [sa.Column("created_at", sa.DateTime())]
+    if updated:
+        columns.append(sa.Column("updated_at", sa.DateTime()))
+    return columns
+
+
+def upgrade() -> None:
+    JOB_SOURCE.create(op.get_bind(), checkfirst=True)
+    APPLICATION_STATUS.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String()),
+        sa.Column("auth_provider", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_verified", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "user_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("resume_url", sa.String()),
+        sa.Column("cover_letter_template", sa.Text()),
+        sa.Column("skills", sa.JSON()),
+        sa.Column("experience_years", sa.Integer()),
+        sa.Column("linkedin_url", sa.String()),
+        sa.Column("linkedin_cookies", sa.String()),
+        sa.Column("gemini_api_key", sa.String()),
+        sa.Column("github_url", sa.String()),
+        sa.Column("portfolio_url", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("location", sa.String()),
+        sa.Column("job_preferences", sa.JSON()),
+        *_timestamps(),
+    )
+    op.create_index("ix_user_profiles_id", "user_profiles", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("external_id", sa.String()),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("location", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("requirements", sa.Text()),
+        sa.Column("salary_min", sa.Integer()),
+        sa.Column("salary_max", sa.Integer()),
+        sa.Column("job_type", sa.String()),
+        sa.Column("remote", sa.Boolean()),
+        sa.Column("source", JOB_SOURCE, nullable=False),
+        sa.Column("source_url", sa.String(), nullable=False),
+        sa.Column("posted_date", sa.DateTime()),
+        sa.Column("expires_date", sa.DateTime()),
+        sa.Column("job_metadata", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_external_id", "jobs", ["external_id"], unique=True)
+    op.create_index("ix_jobs_title", "jobs", ["title"])
+    op.create_index("ix_jobs_company", "jobs", ["company"])
+
+    op.create_table(
+        "job_applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=False),
+        sa.Column("status", APPLICATION_STATUS),
+        sa.Column("resume_used", sa.String()),
+        sa.Column("cover_letter_used", sa.Text()),
+        sa.Column("applied_at", sa.DateTime()),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("automation_log", sa.JSON()),
+        sa.Column("screenshot_url", sa.String()),
+        *_timestamps(),
+    )
+    op.create_index("ix_job_applications_id", "job_applications", ["id"])
+
+    op.create_table(
+        "saved_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id"), nullable=False),
+        sa.Column("notes", sa.Text()),
+        *_timestamps(updated=False),
+    )
+    op.create_index("ix_saved_jobs_id", "saved_jobs", ["id"])
+
+    op.create_table(
+        "crawler_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("search_query", sa.String(), nullable=False),
+        sa.Column("location", sa.String()),
+        sa.Column("source", JOB_SOURCE, nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("jobs_found", sa.Integer()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("screenshot_url", sa.String()),
+        *_timestamps(updated=False),
+    )
+    op.create_index("ix_crawler_jobs_id", "crawler_jobs", ["id"])
+
+    op.create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("file_url", sa.String(), nullable=False),
+        sa.Column("file_name", sa.String(), nullable=False),
+        sa.Column("extracted_text", sa.Text()),
+        *_timestamps(updated=False),
+    )
+    op.create_index("ix_resumes_id", "resumes", ["id"])
+
+    op.create_table(
+        "ai_usage_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("service_type", sa.String(), nullable=False),
+        sa.Column("input_tokens", sa.Integer()),
+        sa.Column("output_tokens", sa.Integer()),
+        sa.Column("total_tokens", sa.Integer()),
+        sa.Column("status", sa.String()),
+        sa.Column("error_message", sa.Text()),
+        *_timestamps(updated=False),
+    )
+    op.create_index("ix_ai_usage_logs_id", "ai_usage_logs", ["id"])
+
+
+def downgrade() -> None:
+    for table in (
+        "ai_usage_logs", "resumes", "crawler_jobs", "saved_jobs",
+        "job_applications", "jobs", "user_profiles", "users",
+    ):
+        op.drop_table(table)
+    APPLICATION_STATUS.drop(op.get_bind(), checkfirst=True)
+    JOB_SOURCE.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""jsonb automation log and job metadata
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("jobs", "job_metadata", "idx_jobs_metadata_gin"),
+    ("job_applications", "automation_log", "idx_applications_automation_log_gin"),
+)
+
+
+def upgrade() -> None:
+    for table, column, index in COLUMNS:
+        op.alter_column(
+            table, column, type_=postgresql.JSONB(), existing_type=sa.JSON(),
+            postgresql_using=f"{column}::jsonb",
+        )
+        op.create_index(
+            index, table, [column],
+            postgresql_using="gin", postgresql_ops={column: "jsonb_path_ops"},
+        )
+
+
+def downgrade() -> None:
+    for table, column, index in COLUMNS:
+        op.drop_index(index, table_name=table)
+        op.alter_column(
+            table, column, type_=sa.JSON(), existing_type=postgresql.JSONB(),
+            postgresql_using=f"{column}::json",
+        )
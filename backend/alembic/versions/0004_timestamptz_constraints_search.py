@@ -0,0 +1,118 @@
+"""timestamptz, unique pairs and search indexes
+
+Brings the baseline tables up to the current models: UTC timestamptz columns
+with NOW() defaults, one application / saved job per user and job, the
+listing and search indexes, and the generated full-text search column.
+
+The indexes are built CONCURRENTLY, but the timestamptz conversion and the
+stored search_vector column rewrite their tables under an ACCESS EXCLUSIVE
+lock: run this with the API and workers stopped.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (table, columns) stored as naive UTC by the old datetime.utcnow defaults
+TIMESTAMP_COLUMNS = (
+    ("users", ("created_at", "updated_at")),
+    ("user_profiles", ("created_at", "updated_at")),
+    ("jobs", ("posted_date", "expires_date", "created_at", "updated_at")),
+    ("job_applications", ("applied_at", "created_at", "updated_at")),
+    ("saved_jobs", ("created_at",)),
+    ("crawler_jobs", ("started_at", "completed_at", "created_at")),
+    ("resumes", ("created_at",)),
+    ("ai_usage_logs", ("created_at",)),
+)
+DEFAULT_NOW_COLUMNS = ("created_at", "updated_at")
+
+# (table, constraint, which duplicate to keep first)
+UNIQUE_PAIRS = (
+    # The furthest-along application wins (APPLIED and the outcomes after it,
+    # then IN_PROGRESS, PENDING, FAILED), then the newest
+    ("job_applications", "uq_applications_user_job",
+     "CASE status WHEN 'FAILED' THEN 0 WHEN 'PENDING' THEN 1 "
+     "WHEN 'IN_PROGRESS' THEN 2 ELSE 3 END DESC, id DESC"),
+    ("saved_jobs", "idx_saved_jobs_unique", "id DESC"),
+)
+
+SEARCH_VECTOR_EXPR = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(company, '') "
+    "|| ' ' || coalesce(description, ''))"
+)
+
+INDEXES = (
+    ("idx_jobs_active_created_at_id", "jobs", ["is_active", "created_at", "id"], {}),
+    ("idx_jobs_search_vector", "jobs", ["search_vector"], {"postgresql_using": "gin"}),
+    *(
+        (f"idx_jobs_{column}_trgm", "jobs", [column],
+         {"postgresql_using": "gin", "postgresql_ops": {column: "gin_trgm_ops"}})
+        for column in ("title", "company", "location")
+    ),
+    ("idx_jobs_title_lower", "jobs", [sa.text("lower(title) text_pattern_ops")], {}),
+    ("idx_jobs_company_lower", "jobs", [sa.text("lower(company) text_pattern_ops")], {}),
+    ("idx_applications_user_status", "job_applications", ["user_id", "status"], {}),
+    ("idx_applications_user_created_at_id", "job_applications", ["user_id", "created_at", "id"], {}),
+    ("idx_saved_jobs_user_created_at_id", "saved_jobs", ["user_id", "created_at", "id"], {}),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in TIMESTAMP_COLUMNS:
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(timezone=True), existing_type=sa.DateTime(),
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                server_default=sa.func.now() if column in DEFAULT_NOW_COLUMNS else None,
+            )
+
+    # Duplicates were possible before the constraints; keep one row per pair
+    for table, name, keep_order in UNIQUE_PAIRS:
+        op.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            f"SELECT id FROM (SELECT id, row_number() OVER ("
+            f"PARTITION BY user_id, job_id ORDER BY {keep_order}) AS rank "
+            f"FROM {table}) ranked WHERE rank > 1)"
+        )
+        op.create_unique_constraint(name, table, ["user_id", "job_id"])
+
+    op.add_column(
+        "jobs",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_EXPR, persisted=True)),
+    )
+
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+    op.drop_column("jobs", "search_vector")
+
+    for table, name, _ in UNIQUE_PAIRS:
+        op.drop_constraint(name, table, type_="unique")
+
+    for table, columns in TIMESTAMP_COLUMNS:
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(), existing_type=sa.DateTime(timezone=True),
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                server_default=None,
+            )
@@ -1,16 +1,30 @@
 """
 Job Applications API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, raiseload, load_only
+from typing import List, Optional
+from datetime import datetime, timezone
 
+from app.core.crypto import decrypt_value
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, paginate_newest_first
+from app.core.responses import UTCORJSONResponse
 from app.core.security import get_current_active_user
-from app.models.models import JobApplication, Job, User, ApplicationStatus
-from app.schemas.schemas import ApplicationCreate, ApplicationResponse, BatchApplicationCreate
-from app.services.applicator import apply_to_job_task
+from app.models.models import JobApplication, Job, User, UserProfile, Resume, ApplicationStatus
+from app.schemas.schemas import (
+    ApplicationCreate,
+    ApplicationResponse,
+    ApplicationListItemResponse,
+    BatchApplicationCreate,
+    dump_trusted
+)
+from app.services.ai import AIService
+from app.workers.celery_worker import APPLY_QUEUE, apply_to_job_celery_task
 
 router = APIRouter()
 
@@ -18,107 +32,164 @@ router = APIRouter()
 @router.post("/apply", response_model=ApplicationResponse, status_code=201)
 async def apply_to_job(
     application_data: ApplicationCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Apply to a job (creates application and queues automation task)"""
-    # Check if job exists
-    job = db.query(Job).filter(Job.id == application_data.job_id).first()
-    if not job:
+    # Insert in one round-trip; a duplicate is skipped by the unique constraint
+    # and a missing job surfaces as a foreign key violation
+    stmt = pg_insert(JobApplication).values(
+        user_id=current_user.id,
+        job_id=application_data.job_id,
+        status=ApplicationStatus.PENDING,
+        resume_used=application_data.resume_url,
+        cover_letter_used=application_data.cover_letter
+    ).on_conflict_do_nothing(
+        index_elements=["user_id", "job_id"]
+    ).returning(JobApplication)
+    
+    try:
+        application = (await db.scalars(stmt)).first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Check if already applied
-    existing = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id,
-        JobApplication.job_id == application_data.job_id
-    ).first()
+    if application:
+        # Hand the automation off to a Celery worker
+        apply_to_job_celery_task.apply_async(
+            args=[application.id, current_user.id, application.job_id],
+            queue=APPLY_QUEUE
+        )
+        await db.refresh(application, ["job"])
+        return application
     
-    if existing:
-        if existing.status == ApplicationStatus.FAILED:
-            # Reset and retry
-            existing.status = ApplicationStatus.PENDING
-            existing.error_message = None
-            existing.automation_log = None
-            existing.applied_at = None
-            existing.created_at = datetime.utcnow()
-            
-            db.commit()
-            db.refresh(existing)
-            
-            # Queue background task
-            background_tasks.add_task(
-                apply_to_job_task,
-                existing.id,
-                current_user.id,
-                job.id
-            )
-            return existing
-            
+    # Already applied - only failed applications may be retried
+    not_retryable = await db.scalar(
+        select(exists().where(
+            JobApplication.user_id == current_user.id,
+            JobApplication.job_id == application_data.job_id,
+            JobApplication.status != ApplicationStatus.FAILED
+        ))
+    )
+    
+    if not_retryable:
         raise HTTPException(
             status_code=400,
             detail="Already applied to this job"
         )
     
-    # Create application record
-    application = JobApplication(
-        user_id=current_user.id,
-        job_id=application_data.job_id,
-        status=ApplicationStatus.PENDING,
-        resume_used=application_data.resume_url,
-        cover_letter_used=application_data.cover_letter
+    # Rare path: load the full failed row to reset it
+    result = await db.execute(
+        select(JobApplication).options(
+            selectinload(JobApplication.job)
+        ).where(
+            JobApplication.user_id == current_user.id,
+            JobApplication.job_id == application_data.job_id
+        )
     )
+    existing = result.scalars().first()
+    
+    # Reset and retry
+    existing.status = ApplicationStatus.PENDING
+    existing.error_message = None
+    existing.automation_log = None
+    existing.applied_at = None
+    existing.created_at = datetime.now(timezone.utc)
     
-    db.add(application)
-    db.commit()
-    db.refresh(application)
+    await db.commit()
     
-    # Queue background task for automated application
-    background_tasks.add_task(
-        apply_to_job_task,
-        application.id,
-        current_user.id,
-        job.id
+    # Hand the automation off to a Celery worker
+    apply_to_job_celery_task.apply_async(
+        args=[existing.id, current_user.id, existing.job_id],
+        queue=APPLY_QUEUE
     )
+    return existing
+
+
+async def _assign_best_resumes(db: AsyncSession, user_id: int, applications: List[JobApplication]):
+    """Pick a resume for every application in a batch with a single Gemini call"""
+    gemini_key_enc = await db.scalar(
+        select(UserProfile.gemini_api_key).where(UserProfile.user_id == user_id).limit(1)
+    )
+    if not gemini_key_enc:
+        return
     
-    return application
+    resumes = (await db.execute(
+        select(Resume.id, Resume.file_url, Resume.extracted_text).where(
+            Resume.user_id == user_id,
+            Resume.extracted_text.isnot(None)
+        )
+    )).all()
+    if not resumes:
+        return
+    
+    jobs = (await db.execute(
+        select(Job.id, Job.description).where(Job.id.in_([a.job_id for a in applications]))
+    )).all()
+    
+    # End the read transaction so no connection is held across the model call
+    await db.commit()
+    
+    ai_service = AIService(decrypt_value(gemini_key_enc), user_id=user_id)
+    matches = await ai_service.analyze_job_match_batch(
+        [{"id": j.id, "description": j.description} for j in jobs],
+        [{"id": r.id, "extracted_text": r.extracted_text} for r in resumes]
+    )
+    
+    # The apply task uses resume_used as-is instead of re-asking Gemini per job
+    file_urls = {r.id: r.file_url for r in resumes}
+    for application in applications:
+        resume_id = matches.get(application.job_id)
+        if resume_id in file_urls:
+            application.resume_used = file_urls[resume_id]
 
 
 @router.post("/batch-apply")
 async def batch_apply(
     batch_data: BatchApplicationCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Apply to multiple jobs at once. Skips duplicates and queues each application."""
     results = {"queued": [], "skipped": [], "not_found": []}
+    to_queue = []
 
-    for job_id in batch_data.job_ids:
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
+    # A repeated id would add the same (user, job) row twice: the status
+    # lookup below can't see an unflushed add
+    for job_id in dict.fromkeys(batch_data.job_ids):
+        job_exists = await db.scalar(select(exists().where(Job.id == job_id)))
+        if not job_exists:
             results["not_found"].append(job_id)
             continue
 
         # Skip if already applied (and not failed)
-        existing = db.query(JobApplication).filter(
-            JobApplication.user_id == current_user.id,
-            JobApplication.job_id == job_id,
-        ).first()
+        existing_status = await db.scalar(
+            select(JobApplication.status).where(
+                JobApplication.user_id == current_user.id,
+                JobApplication.job_id == job_id,
+            )
+        )
 
-        if existing and existing.status != ApplicationStatus.FAILED:
+        if existing_status is not None and existing_status != ApplicationStatus.FAILED:
             results["skipped"].append(job_id)
             continue
 
-        if existing and existing.status == ApplicationStatus.FAILED:
-            # Reset and retry
+        if existing_status == ApplicationStatus.FAILED:
+            # Reset and retry - only now load the full row
+            result = await db.execute(
+                select(JobApplication).where(
+                    JobApplication.user_id == current_user.id,
+                    JobApplication.job_id == job_id,
+                )
+            )
+            existing = result.scalars().first()
             existing.status = ApplicationStatus.PENDING
             existing.error_message = None
             existing.automation_log = None
             existing.applied_at = None
-            existing.created_at = datetime.utcnow()
-            db.commit()
-            background_tasks.add_task(apply_to_job_task, existing.id, current_user.id, job.id)
+            existing.created_at = datetime.now(timezone.utc)
+            to_queue.append(existing)
             results["queued"].append(job_id)
             continue
 
@@ -130,52 +201,94 @@ async def batch_apply(
             cover_letter_used=batch_data.cover_letter,
         )
         db.add(application)
-        db.commit()
-        db.refresh(application)
-
-        background_tasks.add_task(apply_to_job_task, application.id, current_user.id, job.id)
+        to_queue.append(application)
         results["queued"].append(job_id)
 
+    await db.commit()
+
+    # One Gemini round-trip picks resumes for the whole batch; the
+    # applications are already committed, so only resume_used is written after
+    if to_queue and not batch_data.resume_url:
+        await _assign_best_resumes(db, current_user.id, to_queue)
+        await db.commit()
+
+    for application in to_queue:
+        apply_to_job_celery_task.apply_async(
+            args=[application.id, current_user.id, application.job_id], queue=APPLY_QUEUE
+        )
+
     return {
         "message": f"Queued {len(results['queued'])} applications",
         **results,
     }
 
 
-@router.get("/", response_model=List[ApplicationResponse])
+@router.get("/", response_model=List[ApplicationListItemResponse])
 async def list_applications(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     status: ApplicationStatus = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """List all applications for current user"""
-    query = db.query(JobApplication).filter(
+    """List all applications for current user (next page cursor in X-Next-Cursor)"""
+    # Skip automation_log / cover_letter_used and the job description
+    query = select(JobApplication).options(
+        load_only(
+            JobApplication.id,
+            JobApplication.user_id,
+            JobApplication.job_id,
+            JobApplication.status,
+            JobApplication.applied_at,
+            JobApplication.error_message,
+            JobApplication.created_at
+        ),
+        selectinload(JobApplication.job).load_only(
+            Job.id, Job.title, Job.company, Job.location, Job.source, Job.source_url
+        ),
+        raiseload("*")
+    ).where(
         JobApplication.user_id == current_user.id
     )
     
     if status:
-        query = query.filter(JobApplication.status == status)
+        query = query.where(JobApplication.status == status)
     
-    applications = query.order_by(
-        JobApplication.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    query = paginate_newest_first(query, JobApplication, cursor)
+    result = await db.execute(query.limit(limit + 1))
+    applications = result.scalars().all()
     
-    return applications
+    headers = {}
+    if len(applications) > limit:
+        applications = applications[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            applications[-1].created_at, applications[-1].id
+        )
+    
+    # Trusted DB rows: skip pydantic validation and let orjson serialize
+    return UTCORJSONResponse(
+        [dump_trusted(ApplicationListItemResponse, a) for a in applications],
+        headers=headers
+    )
 
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
 async def get_application(
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific application"""
-    application = db.query(JobApplication).filter(
-        JobApplication.id == application_id,
-        JobApplication.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(JobApplication).options(
+            selectinload(JobApplication.job),
+            raiseload("*")
+        ).where(
+            JobApplication.id == application_id,
+            JobApplication.user_id == current_user.id
+        )
+    )
+    application = result.scalars().first()
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -183,39 +296,45 @@ async def get_application(
     return application
 
 
-@router.patch("/{application_id}/status")
+@router.patch("/{application_id}/status", status_code=204)
 async def update_application_status(
     application_id: int,
     status: ApplicationStatus,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update application status manually"""
-    application = db.query(JobApplication).filter(
-        JobApplication.id == application_id,
-        JobApplication.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(JobApplication).where(
+            JobApplication.id == application_id,
+            JobApplication.user_id == current_user.id
+        )
+    )
+    application = result.scalars().first()
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
     application.status = status
-    db.commit()
+    await db.commit()
     
-    return {"message": "Status updated successfully"}
+    return Response(status_code=204)
 
 
-@router.delete("/{application_id}")
+@router.delete("/{application_id}", status_code=204)
 async def delete_application(
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete an application"""
-    application = db.query(JobApplication).filter(
-        JobApplication.id == application_id,
-        JobApplication.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(JobApplication).where(
+            JobApplication.id == application_id,
+            JobApplication.user_id == current_user.id
+        )
+    )
+    application = result.scalars().first()
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -227,47 +346,37 @@ async def delete_application(
             detail="Cannot delete application that has been submitted"
         )
     
-    db.delete(application)
-    db.commit()
+    await db.delete(application)
+    await db.commit()
     
-    return {"message": "Application deleted successfully"}
+    return Response(status_code=204)
 
 
 @router.get("/stats/summary")
 async def get_application_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get application statistics for current user"""
-    total = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id
-    ).count()
-    
-    pending = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id,
-        JobApplication.status == ApplicationStatus.PENDING
-    ).count()
-    
-    applied = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id,
-        JobApplication.status == ApplicationStatus.APPLIED
-    ).count()
-    
-    interviews = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id,
-        JobApplication.status == ApplicationStatus.INTERVIEW
-    ).count()
+    result = await db.execute(
+        select(
+            JobApplication.status,
+            func.count(JobApplication.id)
+        ).where(
+            JobApplication.user_id == current_user.id
+        ).group_by(JobApplication.status)
+    )
+    rows = result.all()
     
-    failed = db.query(JobApplication).filter(
-        JobApplication.user_id == current_user.id,
-        JobApplication.status == ApplicationStatus.FAILED
-    ).count()
+    counts = {status: count for status, count in rows}
+    total = sum(counts.values())
+    applied = counts.get(ApplicationStatus.APPLIED, 0)
     
     return {
         "total": total,
-        "pending": pending,
+        "pending": counts.get(ApplicationStatus.PENDING, 0),
         "applied": applied,
-        "interviews": interviews,
-        "failed": failed,
+        "interviews": counts.get(ApplicationStatus.INTERVIEW, 0),
+        "failed": counts.get(ApplicationStatus.FAILED, 0),
         "success_rate": (applied / total * 100) if total > 0 else 0
     }
@@ -3,7 +3,8 @@ Authentication API Routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import (
@@ -19,12 +20,14 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    existing_user = await db.scalar(
+        select(exists().where(
+            (User.email == user_data.email) | (User.username == user_data.username)
+        ))
+    )
     
     if existing_user:
         raise HTTPException(
@@ -42,8 +45,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     return new_user
 
@@ -51,11 +53,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login user and return access token"""
     # Find user by email (username field in form)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
     
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -84,12 +87,13 @@ async def login(
 @router.post("/oauth/google", response_model=Token)
 async def oauth_google(
     oauth_data: OAuthRegisterLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register or login via Google OAuth. Returns tokens directly (no password needed)."""
     import secrets as _secrets
 
-    user = db.query(User).filter(User.email == oauth_data.email).first()
+    result = await db.execute(select(User).where(User.email == oauth_data.email))
+    user = result.scalars().first()
 
     if not user:
         # First-time Google user — register with a random password they'll never use
@@ -101,8 +105,7 @@ async def oauth_google(
             auth_provider=oauth_data.provider,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
 
     # Issue tokens directly — no password check for OAuth users
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -116,7 +119,7 @@ async def oauth_google(
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     """Refresh access token using refresh token"""
     from jose import jwt, JWTError
     from app.core.config import settings
@@ -139,7 +142,7 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         raise credentials_exception
     
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise credentials_exception
     
@@ -1,54 +1,113 @@
 """
 Jobs API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Text, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, raiseload
+from typing import Dict, List, Optional
 
+from app.core.cache import JOBS_CACHE_PREFIX, JOBS_CACHE_TTL, make_cache_key, cache_get, cache_set
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, paginate_newest_first
+from app.core.responses import UTCORJSONResponse
 from app.core.security import get_current_active_user
 from app.models.models import Job, User, SavedJob, JobSource
 from app.schemas.schemas import (
     JobResponse, 
+    JobListItemResponse,
+    SavedJobResponse,
     JobSearch, 
     CrawlerJobCreate, 
-    CrawlerJobResponse
+    CrawlerJobResponse,
+    dump_trusted
 )
-from app.services.crawler import start_crawler_job
+from app.workers.celery_worker import CRAWL_QUEUE, crawl_jobs_task
 
 router = APIRouter()
 
+# Trailing "*" marks a prefix query, e.g. "Senior Pyth*"
+PREFIX_WILDCARD = "*"
 
-@router.get("/", response_model=List[JobResponse])
+# List views only render a short description snippet
+DESCRIPTION_PREVIEW_CHARS = 300
+
+# Columns backing JobListItemResponse; the full description stays in Postgres
+JOB_LIST_COLUMNS = (
+    Job.id,
+    Job.title,
+    Job.company,
+    Job.location,
+    func.left(Job.description, DESCRIPTION_PREVIEW_CHARS).label("description"),
+    Job.salary_min,
+    Job.salary_max,
+    Job.job_type,
+    Job.remote,
+    Job.source,
+    Job.source_url,
+    Job.created_at,
+)
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE metacharacters so user input matches literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@router.get("/", response_model=List[JobListItemResponse])
 async def list_jobs(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     source: Optional[JobSource] = None,
     remote_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """List all available jobs with filtering"""
-    query = db.query(Job).filter(Job.is_active == True)
+    """List all available jobs with filtering (next page cursor in X-Next-Cursor)"""
+    cache_key = make_cache_key(
+        f"{JOBS_CACHE_PREFIX}list:", [cursor, limit, source, remote_only]
+    )
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return _jobs_page_response(cached["items"], cached["next_cursor"])
+    
+    query = select(*JOB_LIST_COLUMNS).where(Job.is_active == True)
     
     if source:
-        query = query.filter(Job.source == source)
+        query = query.where(Job.source == source)
     
     if remote_only:
-        query = query.filter(Job.remote == True)
+        query = query.where(Job.remote == True)
+    
+    query = paginate_newest_first(query, Job, cursor)
+    result = await db.execute(query.limit(limit + 1))
+    jobs = result.all()
+    
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = encode_cursor(jobs[-1].created_at, jobs[-1].id)
     
-    jobs = query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
-    return jobs
+    items = [dump_trusted(JobListItemResponse, job) for job in jobs]
+    await cache_set(cache_key, {"items": items, "next_cursor": next_cursor}, JOBS_CACHE_TTL)
+    return _jobs_page_response(items, next_cursor)
+
+
+def _jobs_page_response(items: list, next_cursor: Optional[str]) -> UTCORJSONResponse:
+    """Return pre-serialized job items, skipping FastAPI's response_model pass"""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return UTCORJSONResponse(items, headers=headers)
 
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific job by ID"""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     
     if not job:
         raise HTTPException(
@@ -62,42 +121,62 @@ async def get_job(
 @router.post("/search")
 async def search_jobs(
     search: JobSearch,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Search for jobs in the database"""
-    query = db.query(Job).filter(Job.is_active == True)
-    
-    # Search in title, company, description
-    if search.query:
-        search_filter = f"%{search.query}%"
-        query = query.filter(
-            (Job.title.ilike(search_filter)) |
-            (Job.company.ilike(search_filter)) |
-            (Job.description.ilike(search_filter))
+    cache_key = make_cache_key(f"{JOBS_CACHE_PREFIX}search:", search.model_dump(mode="json"))
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
+    query = select(*JOB_LIST_COLUMNS).where(Job.is_active == True)
+    
+    # Search in title, company (trigram indexed) and description (full-text indexed)
+    if search.query and search.query.endswith(PREFIX_WILDCARD):
+        # Prefix-only query: LOWER(col) LIKE 'term%' can use the lower() b-tree indexes
+        prefix = _escape_like(search.query.rstrip(PREFIX_WILDCARD).strip().lower()) + "%"
+        query = query.where(
+            or_(
+                func.lower(Job.title).like(prefix),
+                func.lower(Job.company).like(prefix)
+            )
+        )
+    elif search.query:
+        search_filter = f"%{_escape_like(search.query)}%"
+        query = query.where(
+            or_(
+                Job.search_vector.op("@@")(func.websearch_to_tsquery("english", search.query)),
+                Job.title.ilike(search_filter),
+                Job.company.ilike(search_filter)
+            )
         )
     
     if search.location:
-        query = query.filter(Job.location.ilike(f"%{search.location}%"))
+        query = query.where(Job.location.ilike(f"%{_escape_like(search.location)}%"))
     
     if search.source:
-        query = query.filter(Job.source == search.source)
+        query = query.where(Job.source == search.source)
     
     if search.remote_only:
-        query = query.filter(Job.remote == True)
+        query = query.where(Job.remote == True)
     
     if search.min_salary:
-        query = query.filter(Job.salary_min >= search.min_salary)
+        query = query.where(Job.salary_min >= search.min_salary)
     
-    jobs = query.order_by(Job.created_at.desc()).limit(50).all()
-    return {"results": jobs, "count": len(jobs)}
+    result = await db.execute(query.order_by(Job.created_at.desc()).limit(50))
+    jobs = result.all()
+    
+    results = [dump_trusted(JobListItemResponse, job) for job in jobs]
+    payload = {"results": results, "count": len(results)}
+    await cache_set(cache_key, payload, JOBS_CACHE_TTL)
+    return payload
 
 
 @router.post("/crawl", response_model=CrawlerJobResponse)
 async def crawl_jobs(
     crawler_config: CrawlerJobCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Start a job crawling task"""
@@ -113,16 +192,17 @@ async def crawl_jobs(
     )
     
     db.add(crawler_job)
-    db.commit()
-    db.refresh(crawler_job)
-    
-    # Queue background task
-    background_tasks.add_task(
-        start_crawler_job,
-        crawler_job.id,
-        crawler_config.search_query,
-        crawler_config.location,
-        crawler_config.source
+    await db.commit()
+    
+    # Hand the crawl off to a Celery worker
+    crawl_jobs_task.apply_async(
+        args=[
+            crawler_job.id,
+            crawler_config.search_query,
+            crawler_config.location,
+            crawler_config.source
+        ],
+        queue=CRAWL_QUEUE
     )
     
     return crawler_job
@@ -132,48 +212,63 @@ async def crawl_jobs(
 async def save_job(
     job_id: int,
     notes: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Save a job for later"""
-    # Check if job exists
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    # Insert only if the job exists and isn't already saved, in one round-trip
+    stmt = pg_insert(SavedJob).from_select(
+        ["user_id", "job_id", "notes"],
+        select(
+            literal(current_user.id),
+            Job.id,
+            literal(notes, Text)
+        ).where(Job.id == job_id)
+    ).on_conflict_do_nothing(
+        index_elements=["user_id", "job_id"]
+    ).returning(SavedJob.id)
     
-    # Check if already saved
-    existing = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id,
-        SavedJob.job_id == job_id
-    ).first()
+    saved_job_id = (await db.execute(stmt)).scalar()
+    await db.commit()
     
-    if existing:
+    if saved_job_id is None:
+        job_exists = await db.scalar(select(Job.id).where(Job.id == job_id))
+        if job_exists is None:
+            raise HTTPException(status_code=404, detail="Job not found")
         raise HTTPException(
             status_code=400,
             detail="Job already saved"
         )
     
-    # Save job
-    saved_job = SavedJob(
-        user_id=current_user.id,
-        job_id=job_id,
-        notes=notes
-    )
-    
-    db.add(saved_job)
-    db.commit()
-    
     return {"message": "Job saved successfully"}
 
 
-@router.get("/saved/list")
+@router.get("/saved/list", response_model=Dict[str, List[SavedJobResponse]])
 async def list_saved_jobs(
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """List all saved jobs for current user"""
-    saved_jobs = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id
-    ).all()
+    """List saved jobs for current user, newest first (next page cursor in X-Next-Cursor)"""
+    query = select(SavedJob).options(
+        selectinload(SavedJob.job).load_only(
+            Job.id, Job.title, Job.company, Job.location, Job.source, Job.source_url
+        ),
+        raiseload("*")
+    ).where(SavedJob.user_id == current_user.id)
+    
+    query = paginate_newest_first(query, SavedJob, cursor)
+    result = await db.execute(query.limit(limit + 1))
+    saved_jobs = result.scalars().all()
+    
+    headers = {}
+    if len(saved_jobs) > limit:
+        saved_jobs = saved_jobs[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            saved_jobs[-1].created_at, saved_jobs[-1].id
+        )
     
-    return {"saved_jobs": saved_jobs}
+    return UTCORJSONResponse({
+        "saved_jobs": [dump_trusted(SavedJobResponse, s) for s in saved_jobs]
+    }, headers=headers)
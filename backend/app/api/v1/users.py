@@ -1,21 +1,28 @@
 """
 Users API Routes
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-import os
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import asyncio
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
-from app.models.models import User, UserProfile
+from app.core.crypto import encrypt_value, decrypt_value
+from app.models.models import User, UserProfile, Resume, AIUsageLog
 from app.schemas.schemas import (
     UserResponse, 
     UserProfileCreate, 
     UserProfileUpdate,
-    UserProfileResponse
+    UserProfileResponse,
+    AIUsageStatsResponse,
+    AIUsageByService,
+    LinkedInLoginRequest
 )
+from app.services.applicator import JobApplicator
+from app.services.parser import extract_text_from_file
 from app.services.storage import upload_file_to_storage
-from app.core.crypto import encrypt_value, decrypt_value
 
 router = APIRouter()
 
@@ -28,13 +35,14 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
 
 @router.get("/profile", response_model=UserProfileResponse)
 async def get_user_profile(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user profile"""
-    profile = db.query(UserProfile).filter(
-        UserProfile.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    )
+    profile = result.scalars().first()
     
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -45,14 +53,14 @@ async def get_user_profile(
 @router.post("/profile", response_model=UserProfileResponse, status_code=201)
 async def create_user_profile(
     profile_data: UserProfileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create user profile"""
     # Check if profile already exists
-    existing = db.query(UserProfile).filter(
-        UserProfile.user_id == current_user.id
-    ).first()
+    existing = await db.scalar(
+        select(exists().where(UserProfile.user_id == current_user.id))
+    )
     
     if existing:
         raise HTTPException(
@@ -62,12 +70,11 @@ async def create_user_profile(
     
     profile = UserProfile(
         user_id=current_user.id,
-        **profile_data.dict()
+        **profile_data.model_dump()
     )
     
     db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
     
     return profile
 
@@ -75,35 +82,32 @@ async def create_user_profile(
 @router.put("/profile", response_model=UserProfileResponse)
 async def update_user_profile(
     profile_data: UserProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update user profile"""
-    profile = db.query(UserProfile).filter(
-        UserProfile.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    )
+    profile = result.scalars().first()
     
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
     # Update only provided fields
-    update_data = profile_data.dict(exclude_unset=True)
+    update_data = profile_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
     
     return profile
 
 
-from app.services.parser import extract_text_from_file
-from app.models.models import Resume
-
 @router.post("/upload-resume")
 async def upload_resume(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Upload resume file and extract text"""
@@ -116,28 +120,10 @@ async def upload_resume(
             detail="Only PDF and Word documents are allowed"
         )
     
-    # Upload to storage
-    file_url = await upload_file_to_storage(
-        file=file,
-        user_id=current_user.id,
-        file_type="resume"
-    )
-    
-    # Extract text
-    # We need to read the file again or save it temporarily to extract text if upload_file_to_storage consumes it
-    # For now assuming we can re-read or using a temp path pattern. 
-    # Since upload_file_to_storage likely consumes the stream, we might need to handle this carefully.
-    # Ideally upload_file_to_storage should return the local path or we save it first.
-    # Simpler approach for now: rely on the file path if local, or re-download. 
-    # actually parser needs a file path. 
-    
-    # HACK: For local dev, constructing path from storage logic
-    # In production with S3, we'd need to download it back.
-    # Assuming local storage for now based on project structure.
-    upload_dir = f"/app/storage/users/{current_user.id}/resume"
-    local_path = os.path.join(upload_dir, file.filename)
-    
-    text = await extract_text_from_file(local_path, file.content_type)
+    # Stream the spooled upload to storage, then parse it from the same file;
+    # the two share a file position so they run one after the other
+    file_url = await upload_file_to_storage(file, user_id=current_user.id, file_type="resume")
+    text = await extract_text_from_file(file.file, file.content_type, file.filename)
     
     # Create Resume record
     resume = Resume(
@@ -149,11 +135,14 @@ async def upload_resume(
     db.add(resume)
     
     # Update profile default resume if none
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    result = await db.execute(
+        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    )
+    profile = result.scalars().first()
     if profile and not profile.resume_url:
         profile.resume_url = file_url
         
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Resume uploaded and processed successfully",
@@ -163,87 +152,95 @@ async def upload_resume(
 
 @router.get("/resumes")
 async def get_resumes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all uploaded resumes"""
-    resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
-    return resumes
+    result = await db.execute(select(Resume).where(Resume.user_id == current_user.id))
+    return result.scalars().all()
 
 @router.post("/gemini-key")
 async def set_gemini_key(
     key_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Set Gemini API Key"""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    result = await db.execute(
+        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    )
+    profile = result.scalars().first()
     if not profile:
         profile = UserProfile(user_id=current_user.id)
         db.add(profile)
     
     raw_key = key_data.get('api_key', '')
     profile.gemini_api_key = encrypt_value(raw_key) if raw_key else None
-    db.commit()
+    await db.commit()
     return {"message": "API Key saved successfully"}
 
-@router.delete("/me")
+@router.delete("/me", status_code=204)
 async def delete_user_account(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete user account"""
-    db.delete(current_user)
-    db.commit()
-    return {"message": "Account deleted successfully"}
+    await db.delete(current_user)
+    await db.commit()
+    return Response(status_code=204)
 
 
-from sqlalchemy import func
-from datetime import datetime
-from app.models.models import AIUsageLog
-from app.schemas.schemas import AIUsageStatsResponse, AIUsageByService
-
 @router.get("/ai-usage/stats", response_model=AIUsageStatsResponse)
 async def get_ai_usage_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get AI usage statistics for the current user"""
-    base_query = db.query(AIUsageLog).filter(AIUsageLog.user_id == current_user.id)
-
-    total_requests = base_query.count()
+    total_requests = await db.scalar(
+        select(func.count(AIUsageLog.id)).where(AIUsageLog.user_id == current_user.id)
+    )
 
-    totals = db.query(
-        func.coalesce(func.sum(AIUsageLog.total_tokens), 0),
-        func.coalesce(func.sum(AIUsageLog.input_tokens), 0),
-        func.coalesce(func.sum(AIUsageLog.output_tokens), 0),
-    ).filter(AIUsageLog.user_id == current_user.id).first()
+    totals = (await db.execute(
+        select(
+            func.coalesce(func.sum(AIUsageLog.total_tokens), 0),
+            func.coalesce(func.sum(AIUsageLog.input_tokens), 0),
+            func.coalesce(func.sum(AIUsageLog.output_tokens), 0),
+        ).where(AIUsageLog.user_id == current_user.id)
+    )).first()
 
     total_tokens = int(totals[0])
     total_input_tokens = int(totals[1])
     total_output_tokens = int(totals[2])
 
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_query = base_query.filter(AIUsageLog.created_at >= today_start)
+    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    requests_today = today_query.count()
-    tokens_today_result = db.query(
-        func.coalesce(func.sum(AIUsageLog.total_tokens), 0)
-    ).filter(
-        AIUsageLog.user_id == current_user.id,
-        AIUsageLog.created_at >= today_start
-    ).scalar()
+    requests_today = await db.scalar(
+        select(func.count(AIUsageLog.id)).where(
+            AIUsageLog.user_id == current_user.id,
+            AIUsageLog.created_at >= today_start
+        )
+    )
+    tokens_today_result = await db.scalar(
+        select(
+            func.coalesce(func.sum(AIUsageLog.total_tokens), 0)
+        ).where(
+            AIUsageLog.user_id == current_user.id,
+            AIUsageLog.created_at >= today_start
+        )
+    )
     tokens_today = int(tokens_today_result)
 
-    by_service_rows = db.query(
-        AIUsageLog.service_type,
-        func.count(AIUsageLog.id),
-        func.coalesce(func.sum(AIUsageLog.total_tokens), 0),
-        func.coalesce(func.sum(AIUsageLog.input_tokens), 0),
-        func.coalesce(func.sum(AIUsageLog.output_tokens), 0),
-    ).filter(
-        AIUsageLog.user_id == current_user.id
-    ).group_by(AIUsageLog.service_type).all()
+    by_service_rows = (await db.execute(
+        select(
+            AIUsageLog.service_type,
+            func.count(AIUsageLog.id),
+            func.coalesce(func.sum(AIUsageLog.total_tokens), 0),
+            func.coalesce(func.sum(AIUsageLog.input_tokens), 0),
+            func.coalesce(func.sum(AIUsageLog.output_tokens), 0),
+        ).where(
+            AIUsageLog.user_id == current_user.id
+        ).group_by(AIUsageLog.service_type)
+    )).all()
 
     by_service = [
         AIUsageByService(
@@ -267,13 +264,10 @@ async def get_ai_usage_stats(
     )
 
 
-from app.services.applicator import JobApplicator
-from app.schemas.schemas import LinkedInLoginRequest
-
 @router.post("/connect-linkedin")
 async def connect_linkedin(
     login_data: LinkedInLoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -281,12 +275,16 @@ async def connect_linkedin(
     """
     applicator = JobApplicator()
     try:
-        cookie = applicator.login_linkedin(login_data.email, login_data.password)
+        # Selenium login blocks for seconds; keep it off the event loop
+        cookie = await asyncio.to_thread(
+            applicator.login_linkedin, login_data.email, login_data.password
+        )
         
         # Save cookie to profile
-        profile = db.query(UserProfile).filter(
-            UserProfile.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(UserProfile).where(UserProfile.user_id == current_user.id)
+        )
+        profile = result.scalars().first()
         
         if not profile:
             # Create profile if not exists
@@ -295,7 +293,7 @@ async def connect_linkedin(
         
         profile.linkedin_cookies = encrypt_value(cookie)
         profile.linkedin_url = f"https://www.linkedin.com/in/{current_user.username}"  # heuristic
-        db.commit()
+        await db.commit()
 
         return {"message": "Successfully connected to LinkedIn"}
         
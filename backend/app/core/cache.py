@@ -0,0 +1,58 @@
+"""
+Redis Response Cache
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.responses import ORJSON_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+JOBS_CACHE_PREFIX = "jobs:"
+JOBS_CACHE_TTL = 60  # seconds
+
+redis_client = aioredis.from_url(settings.REDIS_URL)
+
+
+def make_cache_key(prefix: str, params: Any) -> str:
+    """Build a cache key from a prefix and a hash of the (JSON-able) params"""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{prefix}{digest}"
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Return the cached value for key, or None on a miss or Redis error"""
+    try:
+        value = await redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+    return orjson.loads(value) if value is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store value under key for ttl seconds, ignoring Redis errors"""
+    try:
+        await redis_client.setex(key, ttl, orjson.dumps(value, option=ORJSON_OPTIONS))
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def invalidate_jobs_cache() -> None:
+    """Drop all cached job listings (sync, for use from background workers)"""
+    client = redis.Redis.from_url(settings.REDIS_URL)
+    try:
+        keys = list(client.scan_iter(match=f"{JOBS_CACHE_PREFIX}*", count=500))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate jobs cache: {e}")
+    finally:
+        client.close()
@@ -0,0 +1,59 @@
+"""
+Chrome options shared by the applicator and crawler browsers
+
+Nobody watches these browsers, so they run without GPU compositing,
+extensions, background services, audio or images; that is most of Chrome's
+idle RAM and CPU in a worker.
+"""
+from selenium import webdriver
+
+from app.core.config import settings
+
+# Skip image decoding entirely and never prompt for notifications
+CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+# Render the smallest viewport the LinkedIn/Indeed desktop layouts (and the
+# Easy Apply modal) still use, not a full HD frame
+WINDOW_SIZE = "1280,800" if settings.SELENIUM_HEADLESS else "1920,1080"
+
+LEAN_CHROME_ARGS = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-notifications",
+    "--mute-audio",
+    f"--window-size={WINDOW_SIZE}",
+)
+
+
+def add_lean_chrome_args(options, user_agent: str):
+    """Add headless mode, the lean flags and the user agent to any ChromeOptions
+    (including undetected-chromedriver's, which manages its own automation switches)."""
+    if settings.SELENIUM_HEADLESS:
+        options.add_argument("--headless=new")
+    for arg in LEAN_CHROME_ARGS:
+        options.add_argument(arg)
+    options.add_argument(f"user-agent={user_agent}")
+    options.add_experimental_option("prefs", CHROME_PREFS)
+    # get() returns at DOMContentLoaded; explicit waits cover the rest
+    options.page_load_strategy = "eager"
+    return options
+
+
+def chrome_options(user_agent: str, for_crawl: bool = False) -> webdriver.ChromeOptions:
+    """Lean, automation-flag-free ChromeOptions for a Selenium Grid session.
+    Crawls only read card text, so they also turn off images at the Blink level."""
+    options = add_lean_chrome_args(webdriver.ChromeOptions(), user_agent)
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    if for_crawl:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    return options
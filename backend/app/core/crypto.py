@@ -5,13 +5,15 @@ Uses Fernet symmetric encryption keyed from settings.ENCRYPTION_KEY.
 import os
 import base64
 import hashlib
+from functools import lru_cache
 from cryptography.fernet import Fernet
 
 from app.core.config import settings
 
 
+@lru_cache(maxsize=1)
 def _get_fernet() -> Fernet:
-    """Derive a Fernet key from ENCRYPTION_KEY or SECRET_KEY."""
+    """Derive a Fernet key from ENCRYPTION_KEY or SECRET_KEY (once per process)."""
     raw_key = settings.ENCRYPTION_KEY or settings.SECRET_KEY
     # Fernet requires 32 url-safe base64-encoded bytes.
     # Derive a deterministic 32-byte key via SHA-256.
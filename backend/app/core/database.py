@@ -1,11 +1,18 @@
 """
 Database Configuration
 """
-from sqlalchemy import create_engine
+import asyncio
+import logging
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Sync engine for background workers (Celery, Selenium automation)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -15,13 +22,56 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for API request handlers. No per-checkout pre-ping (one extra
+# round trip per request); idle connections are kept alive by keep_pool_warm()
+# and recycled before server/proxy idle timeouts. LIFO reuse keeps the hot set
+# small so surplus connections age out.
+async_engine = create_async_engine(
+    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+    pool_pre_ping=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Dependency for getting database session"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def _ping_idle_connections():
+    pool = async_engine.pool
+    idle = pool.checkedin()
+    if not idle:
+        return
+
+    async def ping():
+        # A dead connection raises here and is invalidated by the pool
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Check them out concurrently so each idle connection gets pinged once
+    results = await asyncio.gather(*(ping() for _ in range(idle)), return_exceptions=True)
+    failed = sum(isinstance(r, Exception) for r in results)
+    if failed:
+        logger.warning(f"DB keepalive: {failed}/{idle} idle connections were stale")
+
+    if pool.checkedout() >= pool.size() + settings.DB_MAX_OVERFLOW:
+        logger.warning(f"DB pool saturated: {pool.status()}")
+
+
+async def keep_pool_warm():
+    """Background task: periodically ping idle pooled connections"""
+    while True:
+        await asyncio.sleep(settings.DB_POOL_KEEPALIVE_INTERVAL)
+        try:
+            await _ping_idle_connections()
+        except Exception as e:
+            logger.warning(f"DB keepalive failed: {e}")
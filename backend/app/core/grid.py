@@ -0,0 +1,78 @@
+"""
+Selenium Grid session slots
+
+A Redis sorted set of active session tokens, shared by every Celery worker
+process, so Grid sessions are requested only while a node slot is free.
+Entries are scored by acquisition time and expire after the Celery hard time
+limit, so a crashed worker can't leak a slot forever; a worker reusing its
+cached browser refreshes the score so the lease runs from the last task.
+"""
+import logging
+import time
+import uuid
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GRID_SLOTS_KEY = "selenium:grid_slots"
+SLOT_LEASE_SECONDS = 30 * 60  # matches Celery's task_time_limit
+SLOT_POLL_INTERVAL = 1.0  # seconds
+
+_ACQUIRE_SLOT_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[3]))
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+_client = redis.Redis.from_url(settings.REDIS_URL)
+_acquire_slot = _client.register_script(_ACQUIRE_SLOT_LUA)
+
+
+def acquire_grid_slot() -> Optional[str]:
+    """Block until a Grid session slot is free and return its token.
+    Fails open (returns None) if Redis is unavailable or the wait times out;
+    the Grid's own session queue is the backstop."""
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.SELENIUM_GRID_SLOT_TIMEOUT
+    try:
+        while True:
+            acquired = _acquire_slot(
+                keys=[GRID_SLOTS_KEY],
+                args=[time.time(), settings.SELENIUM_GRID_MAX_SESSIONS, SLOT_LEASE_SECONDS, token],
+            )
+            if int(acquired):
+                return token
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for a free Selenium Grid slot")
+                return None
+            time.sleep(SLOT_POLL_INTERVAL)
+    except redis.RedisError as e:
+        logger.warning(f"Grid slot acquisition failed: {e}")
+        return None
+
+
+def release_grid_slot(token: Optional[str]):
+    """Return a slot taken by acquire_grid_slot."""
+    if not token:
+        return
+    try:
+        _client.zrem(GRID_SLOTS_KEY, token)
+    except redis.RedisError as e:
+        logger.warning(f"Grid slot release failed: {e}")
+
+
+def refresh_grid_slot(token: Optional[str]):
+    """Restart the lease on a slot held by a reused browser."""
+    if not token:
+        return
+    try:
+        _client.zadd(GRID_SLOTS_KEY, {token: time.time()}, xx=True)
+    except redis.RedisError as e:
+        logger.warning(f"Grid slot refresh failed: {e}")
@@ -0,0 +1,49 @@
+"""
+Background log writing
+
+Moves the root logger's handlers behind a QueueHandler, so the thread that
+logs only enqueues the record and a QueueListener thread formats and writes
+it. Keeps stream/file I/O off request handlers and apply tasks.
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def start_queue_logging() -> None:
+    """Route root logger output through a background listener thread.
+
+    Call after logging is configured and, under prefork, once per child
+    process (listener threads do not survive fork).
+    """
+    global _listener
+    if _listener is not None:
+        return
+    root = logging.getLogger()
+    handlers = [h for h in root.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and restore the original handlers"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
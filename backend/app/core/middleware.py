@@ -0,0 +1,22 @@
+"""
+HTTP middleware
+"""
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Storage files (PDFs, PNGs) are already compressed and are sent zero-copy
+UNCOMPRESSED_PATH_PREFIXES = ("/static/",)
+
+
+class JSONGZipMiddleware(GZipMiddleware):
+    """GZip API responses, but leave storage file downloads untouched so they
+    keep the zero-copy sendfile path"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 5) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(UNCOMPRESSED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,40 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the (created_at, id) position of a row as an opaque cursor"""
+    payload = json.dumps({"ts": created_at.isoformat(), "id": row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["ts"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate_newest_first(query, model, cursor: Optional[str]):
+    """Order a select() newest first and start it after the cursor position"""
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                model.created_at < ts,
+                and_(model.created_at == ts, model.id < row_id)
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc())
@@ -0,0 +1,47 @@
+"""
+Redis-backed rate limiting
+
+A fixed-window counter in Redis, shared by every API and Celery worker
+process. One INCR (plus EXPIRE on the first hit) per check, done atomically
+in a Lua script.
+"""
+import logging
+
+import redis
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WINDOW_COUNTER_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+# Script objects call EVALSHA and fall back to EVAL if the script isn't loaded
+_sync_client = redis.Redis.from_url(settings.REDIS_URL)
+_window_counter = _sync_client.register_script(_WINDOW_COUNTER_LUA)
+_window_counter_async = redis_client.register_script(_WINDOW_COUNTER_LUA)
+
+
+def check_rate_limit(key: str, max_calls: int, window: int) -> bool:
+    """Return True if another call under key is allowed in the current window.
+    Fails open if Redis is unavailable."""
+    try:
+        return int(_window_counter(keys=[key], args=[window])) <= max_calls
+    except redis.RedisError as e:
+        logger.warning(f"Rate limit check failed for {key}: {e}")
+        return True
+
+
+async def check_rate_limit_async(key: str, max_calls: int, window: int) -> bool:
+    """Async variant of check_rate_limit for request handlers."""
+    try:
+        return int(await _window_counter_async(keys=[key], args=[window])) <= max_calls
+    except redis.RedisError as e:
+        logger.warning(f"Rate limit check failed for {key}: {e}")
+        return True
@@ -0,0 +1,56 @@
+"""
+Custom response classes
+"""
+import os
+from typing import Any
+
+import anyio
+import orjson
+from fastapi.responses import FileResponse, ORJSONResponse
+from starlette.types import Receive, Scope, Send
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Naive datetimes are UTC throughout the app; tag them so clients never see a
+# zone-less timestamp
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+
+class UTCORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that serializes naive datetimes as UTC"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """FileResponse that hands the file descriptor to the server when it supports
+    the ASGI zero-copy send extension, so bytes go kernel-to-socket via sendfile().
+    Falls back to FileResponse's chunked read/send otherwise."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if ZEROCOPY_EXTENSION not in scope.get("extensions", {}) or self.send_header_only:
+            await super().__call__(scope, receive, send)
+            return
+
+        fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+        try:
+            stat_result = os.fstat(fd)
+            self.set_stat_headers(stat_result)
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            await send({
+                "type": ZEROCOPY_EXTENSION,
+                "file": fd,
+                "offset": 0,
+                "count": stat_result.st_size,
+                "more_body": False,
+            })
+        finally:
+            os.close(fd)
+
+        if self.background is not None:
+            await self.background()
@@ -2,15 +2,30 @@
 FastAPI Main Application
 Job Application Automation Platform
 """
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from starlette.formparsers import MultiPartParser
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
+import stat
 
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # pragma: no cover - uvloop is not available on Windows
+    pass
+
+from app.core.cache import redis_client
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, keep_pool_warm
+from app.core.log_queue import start_queue_logging, stop_queue_logging
+from app.core.middleware import JSONGZipMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import UTCORJSONResponse, ZeroCopyFileResponse
+from app.services.parser import shutdown_cpu_pool
+from app.services.usage_log import flush_usage_logs
 from app.api.v1 import auth, jobs, applications, users
 from app.core.security import get_current_active_user
 from app.models.models import User
@@ -20,24 +35,42 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 STORAGE_DIR = os.environ.get("STORAGE_DIR", "/app/storage")
+# Resolved once; served paths must stay under this root
+STORAGE_ROOT = os.path.realpath(STORAGE_DIR)
+
+# Keep resume-sized uploads in memory and spill larger ones (up to
+# MAX_FILE_SIZE) to a temp file
+MultiPartParser.max_file_size = settings.UPLOAD_SPOOL_MAX_SIZE
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
+    start_queue_logging()
     logger.info("Starting up...")
-    Base.metadata.create_all(bind=engine)
-    os.makedirs(os.path.join(STORAGE_DIR, "screenshots"), exist_ok=True)
+    # Schema is managed by `alembic upgrade head` at deploy time, not per worker
+    try:
+        os.makedirs(os.path.join(STORAGE_DIR, "screenshots"), exist_ok=True)
+    except OSError as e:
+        logger.warning("Could not create storage directory: %s", e)
+    keepalive_task = asyncio.create_task(keep_pool_warm())
     yield
     # Shutdown
     logger.info("Shutting down...")
+    keepalive_task.cancel()
+    shutdown_cpu_pool()
+    await asyncio.to_thread(flush_usage_logs)
+    await async_engine.dispose()
+    await redis_client.aclose()
+    stop_queue_logging()
 
 
 app = FastAPI(
     title="Job Automation API",
     version="1.0.0",
     description="API for automated job application platform",
+    default_response_class=UTCORJSONResponse,
     lifespan=lifespan
 )
 
@@ -48,8 +81,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Compress JSON responses over 1KB; level 5 balances ratio against CPU
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
@@ -60,28 +97,40 @@ app.include_router(applications.router, prefix="/api/v1/applications", tags=["ap
 @app.get("/static/{file_path:path}")
 async def serve_protected_file(
     file_path: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
 ):
     """Serve storage files with authentication.
     Users can only access their own files or shared screenshots."""
-    full_path = os.path.normpath(os.path.join(STORAGE_DIR, file_path))
+    full_path = os.path.realpath(os.path.join(STORAGE_ROOT, file_path))
 
-    # Prevent directory traversal
-    if not full_path.startswith(os.path.normpath(STORAGE_DIR)):
+    # Prevent directory traversal (including via symlinks and sibling
+    # directories that merely share the prefix, e.g. /app/storage2)
+    if os.path.commonpath([STORAGE_ROOT, full_path]) != STORAGE_ROOT:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    if not os.path.isfile(full_path):
+    try:
+        stat_result = os.stat(full_path, follow_symlinks=False)
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
 
-    # Allow access to own files or screenshots (which may be shared with support)
-    user_dir = f"users/{current_user.id}/"
-    is_own_file = user_dir in file_path
-    is_screenshot = file_path.startswith("screenshots/")
+    # Allow access to own files or screenshots (which may be shared with support).
+    # Decide on the resolved path, not the raw one: "screenshots/../users/2/..."
+    # must be judged as users/2
+    rel_path = os.path.relpath(full_path, STORAGE_ROOT).replace(os.sep, "/")
+    is_own_file = rel_path.startswith(f"users/{current_user.id}/")
+    is_screenshot = rel_path.startswith("screenshots/")
 
     if not is_own_file and not is_screenshot:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return FileResponse(full_path)
+    etag = f'W/"{stat_result.st_size}-{stat_result.st_mtime_ns}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return ZeroCopyFileResponse(full_path, stat_result=stat_result, headers={"ETag": etag})
 
 
 @app.get("/")
@@ -95,4 +144,12 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    pool = async_engine.pool
+    return {
+        "status": "healthy",
+        "db_pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        },
+    }
@@ -1,9 +1,12 @@
 """
 Database Models
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, Enum
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, Enum, Index, UniqueConstraint,
+    Computed, DDL, event, func, text
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import enum
 
 from app.core.database import Base
@@ -30,6 +33,7 @@ class JobSource(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}  # fetch NOW() defaults via RETURNING
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -39,8 +43,8 @@ class User(Base):
     auth_provider = Column(String, default="credentials")  # "credentials" or "google"
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     profiles = relationship("UserProfile", back_populates="user", cascade="all, delete-orphan")
@@ -52,6 +56,7 @@ class User(Base):
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
+    __mapper_args__ = {"eager_defaults": True}  # fetch NOW() defaults via RETURNING
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -67,8 +72,8 @@ class UserProfile(Base):
     phone = Column(String)
     location = Column(String)
     job_preferences = Column(JSON)  # {remote: true, salary_min: 80000, etc}
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="profiles")
@@ -76,6 +81,28 @@ class UserProfile(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __mapper_args__ = {"eager_defaults": True}  # fetch NOW() defaults via RETURNING
+    __table_args__ = (
+        # Active-jobs listing: WHERE is_active ORDER BY created_at DESC, id DESC
+        Index("idx_jobs_active_created_at_id", "is_active", "created_at", "id"),
+        # Same listing filtered by source
+        Index("idx_jobs_source_active_created_at_id", "source", "is_active", "created_at", "id"),
+        # Full-text search over title/company/description
+        Index("idx_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes serve ILIKE '%term%' substring matches
+        Index("idx_jobs_title_trgm", "title", postgresql_using="gin",
+              postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("idx_jobs_company_trgm", "company", postgresql_using="gin",
+              postgresql_ops={"company": "gin_trgm_ops"}),
+        Index("idx_jobs_location_trgm", "location", postgresql_using="gin",
+              postgresql_ops={"location": "gin_trgm_ops"}),
+        # B-tree on LOWER(col) serves case-insensitive prefix matches (LIKE 'term%')
+        Index("idx_jobs_title_lower", text("lower(title) text_pattern_ops")),
+        Index("idx_jobs_company_lower", text("lower(company) text_pattern_ops")),
+        # Containment (@>) filters on platform metadata
+        Index("idx_jobs_metadata_gin", "job_metadata", postgresql_using="gin",
+              postgresql_ops={"job_metadata": "jsonb_path_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, unique=True, index=True)  # Job ID from source platform
@@ -90,33 +117,55 @@ class Job(Base):
     remote = Column(Boolean, default=False)
     source = Column(Enum(JobSource), nullable=False)
     source_url = Column(String, nullable=False)
-    posted_date = Column(DateTime)
-    expires_date = Column(DateTime)
-    job_metadata = Column(JSON)  # Additional platform-specific data
+    posted_date = Column(DateTime(timezone=True))
+    expires_date = Column(DateTime(timezone=True))
+    job_metadata = Column(JSONB)  # Additional platform-specific data
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(company, '') "
+            "|| ' ' || coalesce(description, ''))",
+            persisted=True
+        )
+    ))
     
     # Relationships
     applications = relationship("JobApplication", back_populates="job")
     saved_by = relationship("SavedJob", back_populates="job")
 
 
+# Trigram operator classes used by the jobs search indexes
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __mapper_args__ = {"eager_defaults": True}  # fetch NOW() defaults via RETURNING
+    __table_args__ = (
+        Index("idx_applications_user_status", "user_id", "status"),
+        Index("idx_applications_user_created_at_id", "user_id", "created_at", "id"),
+        # Containment (@>) filters on automation steps, e.g. '[{"step": "submit"}]'
+        Index("idx_applications_automation_log_gin", "automation_log", postgresql_using="gin",
+              postgresql_ops={"automation_log": "jsonb_path_ops"}),
+        UniqueConstraint("user_id", "job_id", name="uq_applications_user_job"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    # Native Postgres enum: a fixed 4-byte value on disk, not varlena text
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.PENDING)
     resume_used = Column(String)
     cover_letter_used = Column(Text)
-    applied_at = Column(DateTime)
+    applied_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
-    automation_log = Column(JSON)  # Log of automation steps
+    automation_log = Column(JSONB)  # Log of automation steps
     screenshot_url = Column(String)  # URL to error screenshot
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="applications")
@@ -125,12 +174,16 @@ class JobApplication(Base):
 
 class SavedJob(Base):
     __tablename__ = "saved_jobs"
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="idx_saved_jobs_unique"),
+        Index("idx_saved_jobs_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="saved_jobs")
@@ -147,11 +200,11 @@ class CrawlerJob(Base):
     source = Column(Enum(JobSource), nullable=False)
     status = Column(String, default="queued")  # queued, running, completed, failed
     jobs_found = Column(Integer, default=0)
-    started_at = Column(DateTime)
-    completed_at = Column(DateTime)
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
     screenshot_url = Column(String)  # URL to error screenshot
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class Resume(Base):
@@ -162,7 +215,7 @@ class Resume(Base):
     file_url = Column(String, nullable=False)
     file_name = Column(String, nullable=False)
     extracted_text = Column(Text)  # Cached content
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="resumes")
@@ -179,7 +232,7 @@ class AIUsageLog(Base):
     total_tokens = Column(Integer, default=0)
     status = Column(String, default="success")  # "success" or "error"
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="ai_usage_logs")
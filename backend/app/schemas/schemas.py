@@ -1,8 +1,8 @@
 """
 Pydantic Schemas for Request/Response Validation
 """
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Optional, List, Dict, Any, Type
 from datetime import datetime
 from app.models.models import ApplicationStatus, JobSource
 
@@ -42,8 +42,7 @@ class UserResponse(UserBase):
     is_verified: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Token(BaseModel):
@@ -70,7 +69,7 @@ class JobBase(BaseModel):
 class JobCreate(JobBase):
     external_id: str
     posted_date: Optional[datetime] = None
-    metadata: Optional[Dict[str, Any]] = None
+    job_metadata: Optional[Dict[str, Any]] = None  # matches Job.job_metadata
 
 
 class JobResponse(JobBase):
@@ -80,8 +79,40 @@ class JobResponse(JobBase):
     is_active: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobSummaryResponse(BaseModel):
+    """Minimal job fields embedded in application and saved-job lists"""
+    id: int
+    title: str
+    company: str
+    location: Optional[str] = None
+    source: JobSource
+    source_url: str
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobListItemResponse(JobSummaryResponse):
+    """Job card in list views; description is a truncated preview"""
+    description: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    job_type: Optional[str] = None
+    remote: bool = False
+    created_at: datetime
+
+
+class SavedJobResponse(BaseModel):
+    id: int
+    user_id: int
+    job_id: int
+    notes: Optional[str] = None
+    created_at: datetime
+    job: JobSummaryResponse
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobSearch(BaseModel):
@@ -118,8 +149,19 @@ class ApplicationResponse(ApplicationBase):
     created_at: datetime
     job: JobResponse
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApplicationListItemResponse(ApplicationBase):
+    id: int
+    user_id: int
+    status: ApplicationStatus
+    applied_at: Optional[datetime]
+    error_message: Optional[str]
+    created_at: datetime
+    job: JobSummaryResponse
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 # User Profile Schemas
@@ -151,8 +193,7 @@ class UserProfileResponse(UserProfileBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Crawler Schemas
@@ -192,5 +233,20 @@ class CrawlerJobResponse(BaseModel):
     completed_at: Optional[datetime]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+def dump_trusted(schema: Type[BaseModel], obj: Any) -> Dict[str, Any]:
+    """Read a schema's fields off a trusted ORM object or row, skipping validation.
+
+    Only for data loaded from our own database on hot list endpoints; the
+    result is serialized directly by orjson.
+    """
+    data = {}
+    for name, field in schema.model_fields.items():
+        value = getattr(obj, name)
+        nested = field.annotation
+        if value is not None and isinstance(nested, type) and issubclass(nested, BaseModel):
+            value = dump_trusted(nested, value)
+        data[name] = value
+    return data
@@ -1,32 +1,259 @@
 import google.generativeai as genai
+from google.generativeai import client as genai_client
+from collections import OrderedDict
+import functools
+import hashlib
 import logging
 import json
-import time
-from typing import List, Dict, Any, Optional
+import orjson
+import re
+import redis
+from typing import List, Dict, Any, Optional, Tuple
 from app.core.config import settings
-from app.core.database import SessionLocal
-from app.models.models import AIUsageLog
+from app.core.rate_limit import check_rate_limit, check_rate_limit_async
+from app.services.usage_log import log_usage
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory rate limiter: max N calls per minute per user
-_rate_limit_store: Dict[int, list] = {}
+# Max Gemini calls per user per window, enforced across all workers via Redis
 _RATE_LIMIT_MAX = 15  # max API calls per minute
 _RATE_LIMIT_WINDOW = 60  # seconds
 
 
+def _rate_limit_key(user_id: int) -> str:
+    return f"ai_rate:{user_id}"
+
+
 def _check_rate_limit(user_id: Optional[int]) -> bool:
     """Return True if the call is allowed, False if rate-limited."""
     if not user_id:
         return True
-    now = time.time()
-    calls = _rate_limit_store.setdefault(user_id, [])
-    # Purge old entries
-    _rate_limit_store[user_id] = [t for t in calls if now - t < _RATE_LIMIT_WINDOW]
-    if len(_rate_limit_store[user_id]) >= _RATE_LIMIT_MAX:
-        return False
-    _rate_limit_store[user_id].append(now)
-    return True
+    return check_rate_limit(_rate_limit_key(user_id), _RATE_LIMIT_MAX, _RATE_LIMIT_WINDOW)
+
+
+async def _check_rate_limit_async(user_id: Optional[int]) -> bool:
+    """Async variant of _check_rate_limit."""
+    if not user_id:
+        return True
+    return await check_rate_limit_async(_rate_limit_key(user_id), _RATE_LIMIT_MAX, _RATE_LIMIT_WINDOW)
+
+
+# Answers for identical (user, prompt) pairs, e.g. retried applications to the
+# same job. Only deterministic services are cached; bounded LRU per process.
+_RESPONSE_CACHE_MAX = 512
+_response_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def _response_cache_key(user_id: int, service_type: str, prompt: str) -> str:
+    digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    return f"{user_id}:{service_type}:{digest}"
+
+
+def _response_cache_get(key: str) -> Optional[Any]:
+    value = _response_cache.get(key)
+    if value is not None:
+        _response_cache.move_to_end(key)
+    return value
+
+
+def _response_cache_put(key: str, value: Any):
+    _response_cache[key] = value
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > _RESPONSE_CACHE_MAX:
+        _response_cache.popitem(last=False)
+
+
+# Resume picks shared by every worker, keyed by user, job description and the
+# set of candidate resumes, so re-uploading a resume naturally misses
+_RESUME_PICK_PREFIX = "resume_pick:"
+_RESUME_PICK_TTL = 86400  # seconds
+_sync_redis = redis.Redis.from_url(settings.REDIS_URL)
+
+
+def _resume_pick_key(user_id: int, job_description: str, resumes: List[Dict[str, Any]]) -> str:
+    resume_ids = ",".join(str(r['id']) for r in sorted(resumes, key=lambda r: r['id']))
+    digest = hashlib.blake2b(f"{job_description}|{resume_ids}".encode(), digest_size=16).hexdigest()
+    return f"{_RESUME_PICK_PREFIX}{user_id}:{digest}"
+
+
+def _resume_pick_get(key: str) -> Optional[int]:
+    try:
+        value = _sync_redis.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Resume pick cache read failed: {e}")
+        return None
+    return int(value) if value is not None else None
+
+
+def _resume_pick_put(key: str, resume_id: int):
+    try:
+        _sync_redis.setex(key, _RESUME_PICK_TTL, resume_id)
+    except redis.RedisError as e:
+        logger.warning(f"Resume pick cache write failed: {e}")
+
+
+# Answers to boilerplate form questions (work authorization, notice period,
+# years with a skill...) per user, in one Redis hash keyed by question text,
+# type and options. The hash itself is keyed by the resume and profile the
+# answers came from, so editing either starts a fresh one. Questions about
+# this particular job are never cached.
+_FORM_ANSWERS_PREFIX = "form_answers:"
+_FORM_ANSWERS_TTL = 30 * 86400  # seconds
+_JOB_SPECIFIC_QUESTION = re.compile(
+    r"\bwhy\b|cover letter|\b(this|the) (role|position|company|job)\b|interest(ed)? in|motivat",
+    re.I,
+)
+
+
+def _form_answer_field(question: Dict[str, Any]) -> str:
+    text = " ".join((question.get('question') or '').lower().split())
+    options = "\x1f".join(str(o) for o in question.get('options') or [])
+    key = f"{text}\x1e{question.get('type')}\x1e{options}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _form_answers_key(user_id: int, resume_text: str, user_profile: Dict[str, Any]) -> str:
+    profile = {k: v for k, v in user_profile.items() if k != 'linkedin_cookies'}
+    context = f"{resume_text or ''}\x1e{json.dumps(profile, sort_keys=True, default=str)}"
+    digest = hashlib.blake2b(context.encode(), digest_size=16).hexdigest()
+    return f"{_FORM_ANSWERS_PREFIX}{user_id}:{digest}"
+
+
+def _cacheable_questions(questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [q for q in questions if not _JOB_SPECIFIC_QUESTION.search(q.get('question') or '')]
+
+
+def _split_cached_answers(
+    questions: List[Dict[str, Any]], cacheable: List[Dict[str, Any]], values: List[Optional[bytes]]
+) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+    answers = {q['id']: v.decode() for q, v in zip(cacheable, values) if v is not None}
+    return answers, [q for q in questions if q['id'] not in answers]
+
+
+def _form_answers_get(
+    key: str, questions: List[Dict[str, Any]]
+) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+    """Return (cached answers, questions still to answer)."""
+    cacheable = _cacheable_questions(questions)
+    if not cacheable:
+        return {}, questions
+    try:
+        values = _sync_redis.hmget(key, [_form_answer_field(q) for q in cacheable])
+    except redis.RedisError as e:
+        logger.warning(f"Form answer cache read failed: {e}")
+        return {}, questions
+    return _split_cached_answers(questions, cacheable, values)
+
+
+def _form_answers_mapping(questions: List[Dict[str, Any]], answers: Dict[str, str]) -> Dict[str, str]:
+    return {
+        _form_answer_field(q): str(answers[q['id']])
+        for q in _cacheable_questions(questions) if answers.get(q['id'])
+    }
+
+
+def _form_answers_put(key: str, questions: List[Dict[str, Any]], answers: Dict[str, str]):
+    mapping = _form_answers_mapping(questions, answers)
+    if not mapping:
+        return
+    try:
+        pipe = _sync_redis.pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, _FORM_ANSWERS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Form answer cache write failed: {e}")
+
+
+# Markdown code fence around a model's JSON reply; the closing fence is optional
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*(?:```)?\s*$", re.DOTALL | re.IGNORECASE)
+
+
+def _loads_fenced(text: str) -> Any:
+    """Parse JSON from a model reply, tolerating a surrounding code fence."""
+    match = _FENCE_RE.match(text)
+    return orjson.loads(match.group(1) if match else text)
+
+
+# Form questions answerable straight from the profile, without a model call.
+# Each maps to the user_profile key holding the answer.
+_PROFILE_QUESTION_PATTERNS = (
+    # Anchored to the whole label: "Phone number" is a profile field, "Are you
+    # available for a phone screen?" is a question for the model
+    (re.compile(r"^\s*(your\s+)?((mobile|cell)\s+)?(phone|telephone|mobile)(\s+number)?[\s?:*]*$", re.I), "phone"),
+    (re.compile(r"^\s*(your\s+)?linked\s?in(\s+profile)?(\s+(url|link))?[\s?:*]*$", re.I), "linkedin"),
+    (re.compile(r"^\s*(your\s+)?(current\s+)?(location|city)(\s*\(city\))?[\s?:*]*$", re.I), "location"),
+    (re.compile(
+        r"^\s*(how many\s+)?(total\s+)?years\s+of\s+(professional\s+|work\s+|relevant\s+)?experience"
+        r"(\s+do you have)?\s*\??\s*$", re.I
+    ), "experience_years"),
+)
+# Anchored too, and the rest of the label must be a single skill name: "Do you
+# have 5+ years of Python?" or "...Python and Kubernetes?" go to the model
+_SKILL_QUESTION = re.compile(
+    r"^\s*(do|have)\s+you\s+(have\s+)?(any\s+)?(experience|worked|used|know)"
+    r"(\s+(with|in|using))?\s+(?P<skill>[^?:*]+?)[\s?:*]*$", re.I
+)
+
+
+def _match_option(answer: str, options: List[str]) -> Optional[str]:
+    """Map a local answer onto one of the question's options, if any fits."""
+    answer = answer.strip().lower()
+    for opt in options:
+        if opt.strip().lower() == answer:
+            return opt
+    return None
+
+
+def _answer_from_profile(
+    questions: List[Dict[str, Any]], user_profile: Dict[str, Any]
+) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+    """
+    Rule-based pre-pass over form questions.
+    Returns (answers, remaining): answers for questions the profile settles,
+    and the questions that still need the model.
+    """
+    skills = {" ".join(str(s).lower().split()) for s in (user_profile.get('skills') or []) if s}
+
+    answers: Dict[str, str] = {}
+    remaining: List[Dict[str, Any]] = []
+    for q in questions:
+        text = q.get('question') or ''
+        answer = None
+
+        for pattern, key in _PROFILE_QUESTION_PATTERNS:
+            value = user_profile.get(key)
+            if value not in (None, '') and pattern.search(text):
+                answer = str(value)
+                break
+
+        # Only settle "yes" locally; a skill missing from the profile may
+        # still be on the resume, so leave that call to the model
+        if answer is None:
+            match = _SKILL_QUESTION.search(text)
+            if match and " ".join(match.group('skill').lower().split()) in skills:
+                answer = "Yes"
+
+        if answer is not None and q.get('options'):
+            answer = _match_option(answer, q['options'])
+
+        if answer is None:
+            remaining.append(q)
+        else:
+            answers[q['id']] = answer
+
+    return answers, remaining
+
+
+@functools.lru_cache(maxsize=32)
+def _get_model(api_key: str) -> genai.GenerativeModel:
+    """Return a Gemini model bound to api_key, built once per key per process."""
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel('gemini-pro')
+    # genai.configure() is process-global; bind this key's client now so a later
+    # configure() for another user's key can't swap it out from under the cache
+    model._client = genai_client.get_default_generative_client()
+    return model
 
 
 class AIService:
@@ -40,15 +267,14 @@ class AIService:
             return
 
         try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = _get_model(api_key.strip())
             logger.info("AIService initialised successfully")
         except Exception as e:
             logger.error(f"Failed to configure Gemini API: {e}")
             self.model = None
 
     def _log_usage(self, service_type: str, response=None, status: str = "success", error_message: str = None):
-        """Log AI usage to the database."""
+        """Queue an AI usage row; written to the database in batches."""
         if not self.user_id:
             return
 
@@ -62,24 +288,56 @@ class AIService:
             output_tokens = getattr(metadata, 'candidates_token_count', 0) or 0
             total_tokens = getattr(metadata, 'total_token_count', 0) or 0
 
-        db = SessionLocal()
-        try:
-            log_entry = AIUsageLog(
-                user_id=self.user_id,
-                service_type=service_type,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                total_tokens=total_tokens,
-                status=status,
-                error_message=error_message,
-            )
-            db.add(log_entry)
-            db.commit()
-        except Exception as e:
-            logger.error(f"Failed to log AI usage: {e}")
-            db.rollback()
-        finally:
-            db.close()
+        log_usage({
+            "user_id": self.user_id,
+            "service_type": service_type,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "status": status,
+            "error_message": error_message,
+        })
+
+    def _cache_key(self, service_type: str, prompt: str) -> Optional[str]:
+        """Response cache key, or None when there's no user to scope it to."""
+        if not self.user_id:
+            return None
+        return _response_cache_key(self.user_id, service_type, prompt)
+
+    async def _generate_async(self, prompt: str):
+        """Call Gemini without blocking the event loop."""
+        if self.model._async_client is None:
+            # Same per-key binding as _get_model; no await in between, so no other
+            # coroutine can re-configure genai under us
+            genai.configure(api_key=self.api_key)
+            self.model._async_client = genai_client.get_default_generative_async_client()
+        return await self.model.generate_content_async(prompt)
+
+    # --- Resume / job matching ---
+
+    def _job_match_prompt(self, job_description: str, resumes: List[Dict[str, Any]]) -> str:
+        return f"""
+        You are an expert HR recruiter.
+
+        Job Description:
+        {job_description[:5000]}
+
+        Resumes:
+        {json.dumps([{ 'id': r['id'], 'text': r['extracted_text'][:2000] } for r in resumes])}
+
+        Task:
+        Select the resume ID that best matches this job description.
+        Return ONLY the resume ID as an integer. nothing else.
+        """
+
+    def _parse_job_match(self, response, resumes: List[Dict[str, Any]]) -> int:
+        valid_ids = {r['id'] for r in resumes}
+        best_resume_id = int(response.text.strip())
+        # Validate: must be one of the provided IDs
+        if best_resume_id not in valid_ids:
+            logger.warning(f"AI returned invalid resume ID {best_resume_id}, falling back")
+            return resumes[0]['id']
+        return best_resume_id
 
     def analyze_job_match(self, job_description: str, resumes: List[Dict[str, Any]]) -> int:
         """
@@ -89,74 +347,108 @@ class AIService:
         if not self.model or not resumes:
             return resumes[0]['id'] if resumes else None
 
+        pick_key = _resume_pick_key(self.user_id, job_description, resumes) if self.user_id else None
+        if pick_key:
+            cached = _resume_pick_get(pick_key)
+            if cached is not None:
+                return cached
+
+        prompt = self._job_match_prompt(job_description, resumes)
+        cache_key = self._cache_key("job_match", prompt)
+        cached = _response_cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached
+
         if not _check_rate_limit(self.user_id):
             logger.warning(f"Rate limit hit for user {self.user_id} on job_match")
             return resumes[0]['id']
 
-        valid_ids = {r['id'] for r in resumes}
+        try:
+            response = self.model.generate_content(prompt)
+            self._log_usage("job_match", response=response)
+            best_resume_id = self._parse_job_match(response, resumes)
+            if cache_key:
+                _response_cache_put(cache_key, best_resume_id)
+            if pick_key and best_resume_id is not None:
+                _resume_pick_put(pick_key, best_resume_id)
+            return best_resume_id
+        except Exception as e:
+            logger.error(f"AI analysis failed: {e}")
+            self._log_usage("job_match", status="error", error_message=str(e))
+            return resumes[0]['id'] if resumes else None
 
-        prompt = f"""
+    def _job_match_batch_prompt(self, jobs: List[Dict[str, Any]], resumes: List[Dict[str, Any]]) -> str:
+        return f"""
         You are an expert HR recruiter.
 
-        Job Description:
-        {job_description[:5000]}
+        Jobs:
+        {json.dumps([{ 'id': j['id'], 'description': (j['description'] or '')[:2000] } for j in jobs])}
 
         Resumes:
         {json.dumps([{ 'id': r['id'], 'text': r['extracted_text'][:2000] } for r in resumes])}
 
         Task:
-        Select the resume ID that best matches this job description.
-        Return ONLY the resume ID as an integer. nothing else.
+        For each job, select the resume ID that best matches its description.
+        Return ONLY a JSON object mapping each job ID to a resume ID, e.g. {{"12": 3, "15": 4}}.
+        """
+
+    def _parse_job_match_batch(self, response, jobs: List[Dict[str, Any]],
+                               resumes: List[Dict[str, Any]]) -> Dict[int, int]:
+        valid_ids = {r['id'] for r in resumes}
+        raw = _loads_fenced(response.text)
+
+        matches = {}
+        for job in jobs:
+            try:
+                resume_id = int(raw.get(str(job['id'])))
+            except (TypeError, ValueError):
+                resume_id = None
+            if resume_id not in valid_ids:
+                logger.warning(f"AI returned no valid resume for job {job['id']}, falling back")
+                resume_id = resumes[0]['id']
+            matches[job['id']] = resume_id
+        return matches
+
+    async def analyze_job_match_batch(self, jobs: List[Dict[str, Any]],
+                                      resumes: List[Dict[str, Any]]) -> Dict[int, int]:
+        """
+        Pick the best resume for several jobs with a single Gemini call.
+        jobs are dicts with 'id' and 'description'. Returns {job_id: resume_id};
+        any job the model skips falls back to the first resume.
         """
+        if not jobs or not resumes:
+            return {}
+
+        fallback = {j['id']: resumes[0]['id'] for j in jobs}
+        if not self.model:
+            return fallback
+
+        if not await _check_rate_limit_async(self.user_id):
+            logger.warning(f"Rate limit hit for user {self.user_id} on job_match")
+            return fallback
 
         try:
-            response = self.model.generate_content(prompt)
+            response = await self._generate_async(self._job_match_batch_prompt(jobs, resumes))
             self._log_usage("job_match", response=response)
-            best_resume_id = int(response.text.strip())
-            # Validate: must be one of the provided IDs
-            if best_resume_id not in valid_ids:
-                logger.warning(f"AI returned invalid resume ID {best_resume_id}, falling back")
-                return resumes[0]['id']
-            return best_resume_id
+            return self._parse_job_match_batch(response, jobs, resumes)
         except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
+            logger.error(f"AI batch analysis failed: {e}")
             self._log_usage("job_match", status="error", error_message=str(e))
-            return resumes[0]['id'] if resumes else None
+            return fallback
 
-    def answer_form_questions(
+    # --- Application form questions ---
+
+    def _form_questions_prompt(
         self,
         questions: List[Dict[str, Any]],
         job_description: str,
         resume_text: str,
         user_profile: Dict[str, Any],
-    ) -> Dict[str, str]:
-        """
-        Answer application form questions using AI.
-
-        Args:
-            questions: List of dicts with keys:
-                - id: element identifier
-                - question: the question text
-                - type: "select", "text", "radio", "checkbox"
-                - options: list of option values (for select/radio/checkbox)
-            job_description: the job posting text
-            resume_text: the applicant's resume text
-            user_profile: dict with user info (skills, location, phone, etc.)
-
-        Returns:
-            Dict mapping question id -> answer value
-        """
-        if not self.model or not questions:
-            return {}
-
-        if not _check_rate_limit(self.user_id):
-            logger.warning(f"Rate limit hit for user {self.user_id} on form_questions")
-            return {}
-
+    ) -> str:
         questions_json = json.dumps(questions, indent=2)
         profile_json = json.dumps({k: v for k, v in user_profile.items() if k != 'linkedin_cookies'}, indent=2)
 
-        prompt = f"""You are a job application assistant helping a candidate apply for a position.
+        return f"""You are a job application assistant helping a candidate apply for a position.
 Your goal is to answer the application form questions in the way most likely to get the candidate an interview.
 
 CANDIDATE RESUME:
@@ -183,59 +475,99 @@ Return ONLY a valid JSON object mapping each question "id" to the answer string.
 Example: {{"q1": "Yes", "q2": "5", "q3": "I have 6 years of experience..."}}
 """
 
+    def _parse_form_answers(
+        self, response, questions: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, str], List[str]]:
+        """Return (answers, ids of questions given the first-option fallback)."""
+        answers = _loads_fenced(response.text)
+        guessed = []
+
+        # Validate: for select/radio questions, ensure the answer is one of the options
+        for q in questions:
+            qid = q.get('id')
+            if qid not in answers:
+                continue
+            if q.get('type') in ('select', 'radio') and q.get('options'):
+                if answers[qid] not in q['options']:
+                    # Try case-insensitive match
+                    matched = next(
+                        (opt for opt in q['options'] if opt.lower() == str(answers[qid]).lower()),
+                        None
+                    )
+                    if matched:
+                        answers[qid] = matched
+                    else:
+                        # Fall back to first option
+                        logger.warning(
+                            f"AI answer '{answers[qid]}' not in options {q['options']} for '{q.get('question', qid)}'"
+                        )
+                        answers[qid] = q['options'][0]
+                        guessed.append(qid)
+
+        logger.info(f"AI answered {len(answers)} form questions")
+        return answers, guessed
+
+    def answer_form_questions(
+        self,
+        questions: List[Dict[str, Any]],
+        job_description: str,
+        resume_text: str,
+        user_profile: Dict[str, Any],
+    ) -> Dict[str, str]:
+        """
+        Answer application form questions using AI.
+
+        Args:
+            questions: List of dicts with keys:
+                - id: element identifier
+                - question: the question text
+                - type: "select", "text", "radio", "checkbox"
+                - options: list of option values (for select/radio/checkbox)
+            job_description: the job posting text
+            resume_text: the applicant's resume text
+            user_profile: dict with user info (skills, location, phone, etc.)
+
+        Returns:
+            Dict mapping question id -> answer value
+        """
+        if not questions:
+            return {}
+
+        # Profile-answerable questions never reach the model
+        answers, questions = _answer_from_profile(questions, user_profile)
+        if answers:
+            logger.info(f"Answered {len(answers)} form question(s) from the profile")
+        cache_key = _form_answers_key(self.user_id, resume_text, user_profile) if self.user_id else None
+        if cache_key and questions:
+            cached, questions = _form_answers_get(cache_key, questions)
+            answers.update(cached)
+        if not self.model or not questions:
+            return answers
+
+        if not _check_rate_limit(self.user_id):
+            logger.warning(f"Rate limit hit for user {self.user_id} on form_questions")
+            return answers
+
+        prompt = self._form_questions_prompt(questions, job_description, resume_text, user_profile)
+
         try:
             response = self.model.generate_content(prompt)
             self._log_usage("form_questions", response=response)
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-            answers = json.loads(text.strip())
-
-            # Validate: for select/radio questions, ensure the answer is one of the options
-            for q in questions:
-                qid = q.get('id')
-                if qid not in answers:
-                    continue
-                if q.get('type') in ('select', 'radio') and q.get('options'):
-                    if answers[qid] not in q['options']:
-                        # Try case-insensitive match
-                        matched = next(
-                            (opt for opt in q['options'] if opt.lower() == str(answers[qid]).lower()),
-                            None
-                        )
-                        if matched:
-                            answers[qid] = matched
-                        else:
-                            # Fall back to first option
-                            logger.warning(
-                                f"AI answer '{answers[qid]}' not in options {q['options']} for '{q.get('question', qid)}'"
-                            )
-                            answers[qid] = q['options'][0]
-
-            logger.info(f"AI answered {len(answers)} form questions")
+            fresh, guessed = self._parse_form_answers(response, questions)
+            if cache_key:
+                # A first-option fallback is a guess; don't make it sticky
+                _form_answers_put(cache_key, [q for q in questions if q['id'] not in guessed], fresh)
+            answers.update(fresh)
             return answers
         except Exception as e:
             logger.error(f"AI form question answering failed: {e}")
             self._log_usage("form_questions", status="error", error_message=str(e))
-            return {}
-
-    def extract_application_data(self, job_description: str, resume_text: str) -> Dict[str, Any]:
-        """
-        Extract specific data points from resume relevant to the job.
-        Returns a dictionary of Q&A.
-        """
-        if not self.model:
-            return {}
+            return answers
 
-        if not _check_rate_limit(self.user_id):
-            logger.warning(f"Rate limit hit for user {self.user_id} on data_extraction")
-            return {}
+    # --- Application data extraction ---
 
-        prompt = f"""
+    def _extraction_prompt(self, job_description: str, resume_text: str) -> str:
+        return f"""
         You are a smart applicant assistant.
 
         Resume:
@@ -257,14 +589,34 @@ Example: {{"q1": "Yes", "q2": "5", "q3": "I have 6 years of experience..."}}
         JSON Output:
         """
 
+    def _parse_extraction(self, response) -> Dict[str, Any]:
+        return _loads_fenced(response.text)
+
+    def extract_application_data(self, job_description: str, resume_text: str) -> Dict[str, Any]:
+        """
+        Extract specific data points from resume relevant to the job.
+        Returns a dictionary of Q&A.
+        """
+        if not self.model:
+            return {}
+
+        prompt = self._extraction_prompt(job_description, resume_text)
+        cache_key = self._cache_key("data_extraction", prompt)
+        cached = _response_cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached
+
+        if not _check_rate_limit(self.user_id):
+            logger.warning(f"Rate limit hit for user {self.user_id} on data_extraction")
+            return {}
+
         try:
             response = self.model.generate_content(prompt)
             self._log_usage("data_extraction", response=response)
-            text = response.text.strip()
-            # Clean up markdown code blocks if present
-            if text.startswith("```json"):
-                text = text[7:-3]
-            return json.loads(text)
+            data = self._parse_extraction(response)
+            if cache_key:
+                _response_cache_put(cache_key, data)
+            return data
         except Exception as e:
             logger.error(f"AI data extraction failed: {e}")
             self._log_usage("data_extraction", status="error", error_message=str(e))
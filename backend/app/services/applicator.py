@@ -5,18 +5,31 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.support.ui import Select as SeleniumSelect
-from datetime import datetime
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, ScriptTimeoutException, StaleElementReferenceException,
+    TimeoutException,
+)
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload
+import base64
 import logging
-import time
 import random
 import os
+import time
+import threading
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
 
+from app.core.chrome import add_lean_chrome_args, chrome_options
 from app.core.config import settings
+from app.core.grid import acquire_grid_slot, refresh_grid_slot, release_grid_slot
 from app.core.database import SessionLocal
 from app.core.crypto import decrypt_value
-from app.models.models import JobApplication, Job, User, ApplicationStatus
+from app.models.models import JobApplication, User, ApplicationStatus
+from app.services.ai import AIService
 
 logger = logging.getLogger(__name__)
 
@@ -30,38 +43,657 @@ _USER_AGENTS = [
 ]
 
 
-def _human_delay(min_s: float = 1.0, max_s: float = 3.5):
-    """Sleep a random duration to mimic human behaviour."""
-    time.sleep(random.uniform(min_s, max_s))
+# No implicit wait is configured on the drivers: every wait below is an
+# explicit WebDriverWait on a concrete condition, so lookups that are expected
+# to miss (optional steps, fallback selectors) fail immediately.
+
+# --- Locators ---
+# Built once at import and shared by every call; fallbacks are listed in the
+# order they're tried.
+
+# LinkedIn login form; where LinkedIn lands after it's submitted
+_LOGIN_EMAIL = (By.ID, "username")
+_LOGIN_PASSWORD = (By.ID, "password")
+_LOGIN_REDIRECT_MARKERS = ("feed", "checkpoint", "challenge", "login-submit", "uas/login")
+
+# Generic form submit (LinkedIn login, Indeed application)
+_FORM_SUBMIT = (By.CSS_SELECTOR, "button[type='submit']")
+_FILE_INPUT = (By.CSS_SELECTOR, "input[type='file']")
+
+_EASY_APPLY_BUTTONS = (
+    # Most reliable: the button has a stable id
+    (By.ID, "jobs-apply-button-id"),
+    # aria-label reads "Easy Apply to <title> at <company>"
+    (By.CSS_SELECTOR, "button[aria-label^='Easy Apply']"),
+    # Button class contains jobs-apply-button (CSS handles multi-class)
+    (By.CSS_SELECTOR, "button.jobs-apply-button"),
+    # Wrapper div class
+    (By.CSS_SELECTOR, ".jobs-apply-button--top-card button"),
+    # Text content fallback
+    (By.XPATH, "//button[.//span[contains(text(), 'Easy Apply')]]"),
+)
+_INDEED_APPLY = (By.ID, "indeedApplyButton")
+_INDEED_APPLY_BUTTONS = (_INDEED_APPLY,)
+
+# Easy Apply modal and the step headings it re-renders between steps
+_EASY_APPLY_MODAL = (By.CSS_SELECTOR, "div[role='dialog']")
+_STEP_HEADING = (By.CSS_SELECTOR, "div[role='dialog'] h3")
+
+# Step detection
+_RESUME_STEP_HEADING = (
+    By.XPATH,
+    "//h3[contains(text(), 'Resume')]"
+    " | //span[contains(text(), 'Resume')]"
+    " | //label[contains(text(), 'Resume')]"
+)
+_LAST_USED_TEXT = (By.XPATH, "//*[contains(text(), 'Last used')]")
+_QUESTIONS_STEP_HEADING = (
+    By.XPATH,
+    "//h3[contains(text(), 'Additional')]"
+    " | //h3[contains(text(), 'Questions')]"
+    " | //h3[contains(text(), 'Work Experience')]"
+    " | //h3[contains(text(), 'Education')]"
+)
+_FORM_SELECTS = (By.CSS_SELECTOR, "div[data-test-form-element] select, .fb-dash-form-element select")
+_FORM_TEXT_INPUTS = (
+    By.CSS_SELECTOR,
+    "div[data-test-form-element] input[type='text'], "
+    "div[data-test-form-element] textarea, "
+    ".fb-dash-form-element input[type='text'], "
+    ".fb-dash-form-element textarea"
+)
+_FORM_RADIOS = (
+    By.CSS_SELECTOR,
+    "div[data-test-form-element] input[type='radio'], "
+    ".fb-dash-form-element input[type='radio']"
+)
+
+# Resume picker
+_RESUME_CARDS = (
+    By.XPATH,
+    "//div[contains(@class, 'jobs-document-upload-redesign-card')]"
+    " | //div[contains(@class, 'ui-attachment')]"
+    " | //div[contains(@class, 'jobs-resume-picker')]"
+    " | //label[contains(@class, 'jobs-document-upload')]"
+)
+_LAST_USED_CARDS = (By.XPATH, "//*[contains(text(), 'Last used')]/..")
+_SELECTED_RESUME = (
+    By.XPATH,
+    "//input[@type='radio' and @checked]"
+    " | //input[@type='radio'][../..//div[contains(@class, 'selected')]]"
+)
+_RESUME_CARD_CONTROL = (By.XPATH, ".//input[@type='radio'] | .//button | .//label")
+_RESUME_PICKER_PROBES = {
+    "cards": _RESUME_CARDS[1],
+    "lastUsedCards": _LAST_USED_CARDS[1],
+    "selected": _SELECTED_RESUME[1],
+    "control": _RESUME_CARD_CONTROL[1],
+}
+
+# Form questions (relative to one form element), walked in-page by
+# _SCRAPE_QUESTIONS_JS
+_SCRAPE_SELECTORS = {
+    "formElements": "div[data-test-form-element]",
+    "formElementsFallback": ".fb-dash-form-element",
+    "questionLabel": "label span[aria-hidden='true'], label",
+    "radio": "input[type='radio']",
+    "checkbox": "input[type='checkbox']",
+    "textInput": "input[type='text'], input:not([type])",
+}
+
+# Footer buttons, scoped to the Easy Apply dialog so only its handful of
+# buttons are tested. Exact aria-label prefixes come first, as CSS; the text
+# matches (the only ones that need XPath) are fallbacks for relabelled variants.
+_DIALOG_BUTTON_CSS = "div[role='dialog'] button"
+_DIALOG_BUTTON = "//div[@role='dialog']//button"
+_NEXT_BUTTONS = (
+    (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}[aria-label^='Continue to next step']"),
+    (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}[aria-label^='Next']"),
+    (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}[aria-label*='Continue']"),
+    (By.XPATH, f"{_DIALOG_BUTTON}[contains(., 'Next')]"),
+)
+_REVIEW_ARIA = (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}[aria-label^='Review']")
+_REVIEW_TEXT = (By.XPATH, f"{_DIALOG_BUTTON}[contains(., 'Review')]")
+_SUBMIT_BUTTONS = (
+    (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}[aria-label^='Submit application']"),
+    (By.XPATH, f"{_DIALOG_BUTTON}[contains(., 'Submit application')]"),
+    (By.CSS_SELECTOR, f"{_DIALOG_BUTTON_CSS}.artdeco-button--primary[aria-label^='Submit']"),
+)
+_REVIEW_BUTTONS = (_REVIEW_ARIA, _REVIEW_TEXT)
+_FINAL_STEP_BUTTONS = (_SUBMIT_BUTTONS[0], _SUBMIT_BUTTONS[1]) + _REVIEW_BUTTONS
+
+_PHONE_INPUT_CSS = "input[id*='phoneNumber'], input[name*='phoneNumber']"
+
+# Step classification probes, evaluated together by _AWAIT_STEP_JS
+_STEP_PROBES = {
+    "phoneInputs": _PHONE_INPUT_CSS,
+    "heading": _STEP_HEADING[1],
+    "resumeStep": [_RESUME_STEP_HEADING[1], _LAST_USED_TEXT[1]],
+    "questionsHeading": _QUESTIONS_STEP_HEADING[1],
+    "formControls": ", ".join(loc[1] for loc in (_FORM_SELECTS, _FORM_TEXT_INPUTS, _FORM_RADIOS)),
+    "finalStep": [list(loc) for loc in _FINAL_STEP_BUTTONS],
+    "review": [list(loc) for loc in _REVIEW_BUTTONS],
+    "scrape": _SCRAPE_SELECTORS,
+}
+
+# A near-empty page on linkedin.com, just to put the browser on the origin
+# before add_cookie when CDP isn't available
+_LINKEDIN_COOKIE_ORIGIN_URL = "https://www.linkedin.com/robots.txt"
+
+
+
+# Wait condition for login_linkedin
+def _login_settled(driver) -> bool:
+    """Login is decided once the URL shows an outcome or the li_at cookie is
+    set (it arrives before the redirect to the feed). One current_url read
+    per poll instead of one per marker."""
+    url = driver.current_url
+    if any(marker in url for marker in _LOGIN_REDIRECT_MARKERS):
+        return True
+    return driver.get_cookie('li_at') is not None
+
+
+# Locator group -> the locator in it that matched last, tried first next time
+_preferred_locators: Dict[tuple, tuple] = {}
+
+# A step has rendered once any of its footer buttons is usable
+_STEP_READY_BUTTONS = _NEXT_BUTTONS + _SUBMIT_BUTTONS + (_REVIEW_ARIA,)
+_STEP_READY_LOCATORS = [list(loc) for loc in _STEP_READY_BUTTONS]
+
+# In-page waits. find(locators) returns [element, locator index] for the first
+# visible, enabled match of any (By, selector) locator (id, CSS or XPath).
+# A MutationObserver re-checks on DOM changes until a match or the timeout,
+# then the script resolves with settle(match or null). The whole wait costs
+# one WebDriver round trip instead of Python polling find_element.
+_FIND_USABLE_JS = """
+const usable = (el) => el && !el.disabled && el.offsetParent !== null;
+const find = (locators) => {
+    for (const [i, [by, selector]] of locators.entries()) {
+        if (by === 'xpath') {
+            const el = document.evaluate(
+                selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+            if (usable(el)) return [el, i];
+        } else if (by === 'id') {
+            const el = document.getElementById(selector);
+            if (usable(el)) return [el, i];
+        } else {
+            for (const el of document.querySelectorAll(selector)) {
+                if (usable(el)) return [el, i];
+            }
+        }
+    }
+    return null;
+};
+"""
+_OBSERVE_UNTIL_FOUND_JS = """
+const found = find(locators);
+if (found) return done(settle(found));
+const observer = new MutationObserver(() => {
+    const match = find(locators);
+    if (match) { observer.disconnect(); clearTimeout(timer); done(settle(match)); }
+});
+observer.observe(document.body || document.documentElement, {
+    childList: true, subtree: true, attributes: true,
+    attributeFilter: ['disabled', 'class', 'style', 'aria-label'],
+});
+const timer = setTimeout(() => { observer.disconnect(); done(settle(null)); }, timeoutMs);
+"""
+# Resolves with [element, locator index], or null after the timeout
+_AWAIT_ELEMENT_JS = """
+const [locators, timeoutMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+const settle = (match) => match;
+""" + _FIND_USABLE_JS + _OBSERVE_UNTIL_FOUND_JS
+
+
+# Sets many form controls in one WebDriver round trip. Uses the native value
+# setter so framework-managed inputs see the change, then fires input/change.
+# Takes [[element, value], ...]; returns the indexes that didn't take (e.g. a
+# select value that isn't one of its options).
+_FILL_FIELDS_JS = """
+const failed = [];
+arguments[0].forEach(([el, value], i) => {
+    if (el.type === 'radio' || el.type === 'checkbox') {
+        if (!el.checked) el.click();
+        if (!el.checked) failed.push(i);
+        return;
+    }
+    const proto = el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+        : el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    if (el.value !== value) failed.push(i);
+});
+return failed;
+"""
+
+# Fills every empty phone input on the step; returns how many were filled
+_FILL_PHONE_FN_JS = """
+const fillPhone = (css, phone) => {
+    let filled = 0;
+    document.querySelectorAll(css).forEach(el => {
+        if (el.value !== '') return;
+        Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set.call(el, phone);
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        filled++;
+    });
+    return filled;
+};
+"""
+
+# Resolves true once the element is detached from the document (or false
+# after the timeout), observing DOM mutations instead of polling staleness
+_AWAIT_DETACHED_JS = """
+const [el, timeoutMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+if (!el.isConnected) return done(true);
+const observer = new MutationObserver(() => {
+    if (!el.isConnected) { observer.disconnect(); clearTimeout(timer); done(true); }
+});
+observer.observe(document, {childList: true, subtree: true});
+const timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+"""
+# Reads LinkedIn's resume picker in one pass: how many cards it lists, whether
+# one is already selected, and the clickable control (radio, else the card) of
+# the first card and of the one with the newest "Last used on M/D/YY(YY)" date
+_RESUME_PICKER_JS = """
+const probes = arguments[0];
+const all = (xpath, ctx) => {
+    const snap = document.evaluate(xpath, ctx || document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: snap.snapshotLength}, (_, i) => snap.snapshotItem(i));
+};
+const control = (card) => all(probes.control, card)[0] || card;
+let cards = all(probes.cards);
+if (!cards.length) cards = all(probes.lastUsedCards);
+
+const LAST_USED = /Last used on\s+(\d{1,2})\/(\d{1,2})\/(\d{2}|\d{4})\b/;
+let newest = null, newestKey = -1, newestDate = null;
+for (const card of cards) {
+    const m = LAST_USED.exec(card.innerText);
+    if (!m) continue;
+    const [month, day] = [Number(m[1]), Number(m[2])];
+    if (month < 1 || month > 12 || day < 1 || day > 31) continue;
+    const year = m[3].length === 2 ? 2000 + Number(m[3]) : Number(m[3]);
+    const key = year * 10000 + month * 100 + day;
+    if (key > newestKey) {
+        newestKey = key;
+        newest = card;
+        newestDate = `${m[1].padStart(2, '0')}/${m[2].padStart(2, '0')}/${year}`;
+    }
+}
+return {
+    count: cards.length,
+    alreadySelected: all(probes.selected).length > 0,
+    newest: newest && control(newest),
+    newestDate: newestDate,
+    first: cards.length ? control(cards[0]) : null,
+};
+"""
+# Returns one entry per labelled form element:
+# {id, question, type, options, select_element | radio_elements + radio_values
+#  | checkbox_elements + checkbox_checked | input_element}
+_SCRAPE_QUESTIONS_FN_JS = """
+const scrapeQuestions = (sel) => {
+    let elements = document.querySelectorAll(sel.formElements);
+    if (!elements.length) elements = document.querySelectorAll(sel.formElementsFallback);
+    const questions = [];
+    elements.forEach((elem, idx) => {
+        const label = elem.querySelector(sel.questionLabel);
+        const question = label ? label.innerText.trim() : '';
+        if (!question) return;
+        const q = {id: 'q' + idx, question: question, type: 'text', options: []};
+
+        const select = elem.querySelector('select');
+        if (select) {
+            q.type = 'select';
+            q.select_element = select;
+            q.options = Array.from(select.options, o => o.value)
+                .filter(v => v && v !== 'Select an option');
+            questions.push(q);
+            return;
+        }
+        const radios = Array.from(elem.querySelectorAll(sel.radio));
+        if (radios.length) {
+            q.type = 'radio';
+            q.radio_elements = radios;
+            q.radio_values = radios.map(r => r.value || '');
+            // One pass over the element's labels instead of a lookup per radio
+            const labelText = new Map(
+                Array.from(elem.querySelectorAll('label[for]'), l => [l.htmlFor, l.innerText.trim()])
+            );
+            q.options = radios.map(r => (r.id && labelText.get(r.id)) || r.value || '');
+            questions.push(q);
+            return;
+        }
+        const checkboxes = Array.from(elem.querySelectorAll(sel.checkbox));
+        if (checkboxes.length) {
+            q.type = 'checkbox';
+            q.checkbox_elements = checkboxes;
+            q.checkbox_checked = checkboxes.map(cb => cb.checked);
+            questions.push(q);
+            return;
+        }
+        const input = elem.querySelector(sel.textInput) || elem.querySelector('textarea');
+        if (input) {
+            q.input_element = input;
+            questions.push(q);
+        }
+    });
+    return questions;
+};
+"""
+_SCRAPE_QUESTIONS_JS = _SCRAPE_QUESTIONS_FN_JS + "return scrapeQuestions(arguments[0]);"
+# Waits for an Easy Apply step to render (any footer button usable), then
+# answers in the same DOM pass every question _fill_linkedin_form asks about
+# it. The step heading comes back for the teardown wait after Next, and a
+# questions step comes back already scraped.
+_AWAIT_STEP_JS = """
+const [locators, probes, phone, timeoutMs, done] = [
+    arguments[0], arguments[1], arguments[2], arguments[3], arguments[arguments.length - 1]
+];
+const first = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const present = ([by, selector]) => by === 'xpath' ? first(selector) : document.querySelector(selector);
+const settle = () => {
+    const state = {
+        isResumeStep: probes.resumeStep.some(x => first(x) !== null),
+        hasFormQuestions: first(probes.questionsHeading) !== null
+            || document.querySelector(probes.formControls) !== null,
+        isFinalStep: probes.finalStep.some(loc => present(loc) !== null),
+        reviewButton: probes.review.map(present).find(el => el !== null) || null,
+        heading: document.querySelector(probes.heading),
+        questions: null,
+        phoneFilled: phone ? fillPhone(probes.phoneInputs, phone) : 0,
+    };
+    if (state.hasFormQuestions && !state.isResumeStep) {
+        state.questions = scrapeQuestions(probes.scrape);
+    }
+    return state;
+};
+""" + _SCRAPE_QUESTIONS_FN_JS + _FILL_PHONE_FN_JS + _FIND_USABLE_JS + _OBSERVE_UNTIL_FOUND_JS
+
+# Automation only needs the DOM: on top of the image-off Chrome pref (see
+# app.core.chrome), block fonts, media and trackers at the network layer (CDP).
+# Stylesheets stay, since clickability/visibility checks depend on layout.
+_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*/ads/*",
+]
+
+WAIT_TIMEOUT = 10  # seconds, default for explicit waits
+# Poll twice as often as Selenium's 0.5s default: elements that appear
+# mid-interval are picked up sooner
+WAIT_POLL_FREQUENCY = 0.25
+# Keep-alive connections kept to chromedriver/Grid per driver. urllib3 defaults
+# to one, which makes overlapping commands open and drop extra sockets.
+COMMAND_POOL_MAXSIZE = 4
+# Cap on driver.get(); past it the page is stopped and used as loaded so far
+PAGE_LOAD_TIMEOUT = 15  # seconds
+# Buttons are re-found and re-clicked if late scripts re-render them, after
+# 0.1 s, then 0.2 s (the button is usually back within a frame or two)
+CLICK_ATTEMPTS = 3
+CLICK_RETRY_BASE_DELAY = 0.1  # seconds, doubled per retry
+
+
+# One browser per worker process (thread), reused across apply tasks so Chrome
+# startup is paid once rather than per application
+_DRIVER_TLS = threading.local()
+
+
+@lru_cache(maxsize=256)
+def _decrypt_cached(ciphertext: str) -> str:
+    """decrypt_value memoized per stored ciphertext, so a worker applying for
+    the same user again skips the Fernet decrypt of their key and cookies"""
+    return decrypt_value(ciphertext)
+
+
+SCREENSHOT_DIR = "/app/storage/screenshots"
+# Chrome encodes failure screenshots as JPEG itself (via CDP): several times
+# smaller than the WebDriver PNG and still legible for debugging
+SCREENSHOT_JPEG_QUALITY = 80
+
+# Screenshots are grabbed into memory and written to disk in the background,
+# so a failing application gives its browser back without waiting on file I/O
+_screenshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-writer")
+# Only touched from the single writer thread
+_screenshot_dir_ready = False
+
+
+def _write_screenshot(filepath: str, image: bytes):
+    global _screenshot_dir_ready
+    try:
+        if not _screenshot_dir_ready:
+            os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+            _screenshot_dir_ready = True
+        with open(filepath, "wb") as f:
+            f.write(image)
+        logger.info("Screenshot saved to %s", filepath)
+    except OSError as e:
+        # Re-check the directory on the next write in case it was removed
+        _screenshot_dir_ready = False
+        logger.error("Failed to write screenshot %s: %s", filepath, e)
+
+
+def flush_screenshot_writes():
+    """Wait for queued screenshot writes (worker process shutdown)."""
+    _screenshot_writer.shutdown(wait=True)
+
+
+# undetected_chromedriver module once imported, False once known missing.
+# Imported on first use: it's slow to import (requests, websockets) and only
+# the local-browser path needs it. A failed import isn't cached by Python,
+# so remembering it spares every Grid-only driver start a sys.path search.
+_uc = None
+
+
+def _load_undetected_chromedriver():
+    global _uc
+    if _uc is None:
+        try:
+            import undetected_chromedriver
+            _uc = undetected_chromedriver
+        except ImportError as e:
+            logger.warning("undetected-chromedriver not installed (%s), using Selenium Grid", e)
+            _uc = False
+    return _uc or None
+
+
+def shutdown_worker_driver():
+    """Quit this worker's cached browser (worker process shutdown)."""
+    applicator = getattr(_DRIVER_TLS, 'applicator', None)
+    _DRIVER_TLS.applicator = None
+    if applicator:
+        try:
+            applicator._close_driver()
+        except Exception as e:
+            logger.warning("Failed to quit cached WebDriver: %s", e)
 
 
 class JobApplicator:
     """Handles automated job applications using Selenium"""
 
+    @classmethod
+    def for_worker(cls) -> "JobApplicator":
+        """
+        Return this worker's applicator with a live browser, starting one only
+        if there's none cached, the cached session has died, or it has served
+        SELENIUM_MAX_APPS_PER_DRIVER applications (long-lived Chrome leaks memory).
+        """
+        applicator = getattr(_DRIVER_TLS, 'applicator', None)
+        if applicator and applicator.driver:
+            if applicator._apps_since_restart >= settings.SELENIUM_MAX_APPS_PER_DRIVER:
+                logger.info("Recycling WebDriver after %s applications", applicator._apps_since_restart)
+                shutdown_worker_driver()
+            else:
+                try:
+                    applicator.driver.current_url  # cheap liveness probe
+                    applicator._apps_since_restart += 1
+                    refresh_grid_slot(applicator._grid_slot)
+                    return applicator
+                except Exception:
+                    logger.warning("Cached WebDriver session is gone, starting a new one")
+                    shutdown_worker_driver()
+
+        applicator = cls()
+        applicator._init_driver()
+        applicator._apps_since_restart = 1
+        _DRIVER_TLS.applicator = applicator
+        return applicator
+
+    def reset_session(self):
+        """
+        Clear per-user state so the next task starts clean: cookies for every
+        domain (not just the current one), web storage, and the open page.
+        Quits the browser instead if it can't be reset.
+        """
+        if not self.driver:
+            return
+        try:
+            try:
+                self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                self.driver.delete_all_cookies()
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            self.driver.get("about:blank")
+        except Exception as e:
+            logger.warning("Could not reset WebDriver session (%s), discarding it", e)
+            if getattr(_DRIVER_TLS, 'applicator', None) is self:
+                shutdown_worker_driver()
+            else:
+                self._close_driver()
+
     def __init__(self):
         self.driver = None
+        self._grid_slot = None
+        self._waits = {}
         self._use_undetected = True  # prefer undetected-chromedriver
+        self._apps_since_restart = 0
+
+    def __enter__(self) -> "JobApplicator":
+        if not self.driver:
+            self._init_driver()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._close_driver()
+
+    def _wait(self, timeout: float = WAIT_TIMEOUT) -> WebDriverWait:
+        """WebDriverWait bound to the current driver, built once per timeout"""
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = self._waits[timeout] = WebDriverWait(
+                self.driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY
+            )
+        return wait
+
+    @property
+    def wait(self) -> WebDriverWait:
+        return self._wait()
+
+    def _await_element(self, locators, timeout: float):
+        """
+        Wait in the page for the first visible, enabled match of any
+        (By, selector) locator. Returns the element, or None on timeout.
+
+        The locator that matched last time for this group is tried first, so
+        once LinkedIn's markup settles the fallbacks are rarely evaluated.
+        """
+        locators = tuple(locators)
+        preferred = _preferred_locators.get(locators)
+        if preferred:
+            ordered = (preferred,) + tuple(loc for loc in locators if loc != preferred)
+        else:
+            ordered = locators
+        try:
+            match = self.driver.execute_async_script(
+                _AWAIT_ELEMENT_JS, [list(loc) for loc in ordered], int(timeout * 1000)
+            )
+        except (TimeoutException, ScriptTimeoutException):
+            return None
+        if not match:
+            return None
+        element, index = match
+        _preferred_locators[locators] = ordered[index]
+        return element
+
+    def _await_step(self, timeout: float, phone: str = None) -> dict:
+        """Wait for the current Easy Apply step to render and classify it,
+        filling any empty phone inputs on it with phone."""
+        try:
+            return self.driver.execute_async_script(
+                _AWAIT_STEP_JS, _STEP_READY_LOCATORS, _STEP_PROBES, phone, int(timeout * 1000)
+            )
+        except (TimeoutException, ScriptTimeoutException):
+            # Classify whatever has rendered so far
+            return self.driver.execute_async_script(
+                _AWAIT_STEP_JS, _STEP_READY_LOCATORS, _STEP_PROBES, phone, 0
+            )
+
+    def _wait_for_staleness(self, element, timeout: float):
+        """Wait for an element to leave the DOM; a timeout is not an error."""
+        if element is None:
+            return
+        try:
+            self.driver.execute_async_script(_AWAIT_DETACHED_JS, element, int(timeout * 1000))
+        except (StaleElementReferenceException, JavascriptException):
+            pass  # already gone, or the page navigated away mid-wait
+        except (TimeoutException, ScriptTimeoutException):
+            pass
+
+    def _cdp(self, cmd: str, params: dict) -> bool:
+        """Run a Chrome DevTools command if the driver exposes CDP (local
+        Chrome does, a plain Remote session doesn't). Returns whether it ran."""
+        execute_cdp_cmd = getattr(self.driver, "execute_cdp_cmd", None)
+        if execute_cdp_cmd is None:
+            return False
+        execute_cdp_cmd(cmd, params)
+        return True
+
+    def _set_timeouts(self):
+        """
+        Cap page loads and pin the implicit wait to zero. Every lookup that
+        should wait is an explicit or in-page wait, and the find_element(s)
+        probes for optional elements must miss immediately rather than block.
+        """
+        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        self.driver.implicitly_wait(0)
+
+    def _widen_command_pool(self):
+        """Let the driver's urllib3 pool keep several keep-alive connections"""
+        conn = getattr(self.driver.command_executor, "_conn", None)
+        if conn is None:
+            return
+        conn.connection_pool_kw.update(maxsize=COMMAND_POOL_MAXSIZE, block=False)
+        conn.clear()  # the session-start pool was built with maxsize=1
+
+    def _block_heavy_resources(self):
+        try:
+            if self._cdp("Network.enable", {}):
+                self._cdp("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+        except Exception as e:
+            logger.warning("Could not enable resource blocking: %s", e)
 
     def _init_driver(self):
         """Initialize Selenium WebDriver with anti-detection measures."""
+        self._waits.clear()
         user_agent = random.choice(_USER_AGENTS)
 
         # --- Try undetected-chromedriver first (local/headful mode) ---
-        if self._use_undetected:
+        uc = _load_undetected_chromedriver() if self._use_undetected else None
+        if uc is not None:
             try:
-                import undetected_chromedriver as uc
-                uc_options = uc.ChromeOptions()
-                if settings.SELENIUM_HEADLESS:
-                    uc_options.add_argument("--headless=new")
-                uc_options.add_argument("--no-sandbox")
-                uc_options.add_argument("--disable-dev-shm-usage")
-                uc_options.add_argument(f"user-agent={user_agent}")
-                uc_options.add_argument("--window-size=1920,1080")
-                uc_options.add_argument("--disable-extensions")
+                uc_options = add_lean_chrome_args(uc.ChromeOptions(), user_agent)
                 uc_options.add_argument("--disable-popup-blocking")
 
                 self.driver = uc.Chrome(options=uc_options)
-                self.driver.implicitly_wait(settings.SELENIUM_TIMEOUT)
+                self._widen_command_pool()
+                self._set_timeouts()
+                self._block_heavy_resources()
 
                 # Remove webdriver fingerprint traces
                 self.driver.execute_cdp_cmd(
@@ -77,74 +709,81 @@ class JobApplicator:
                 logger.info("Initialized undetected-chromedriver successfully")
                 return
             except Exception as e:
-                logger.warning(f"undetected-chromedriver unavailable ({e}), falling back to Selenium Grid")
+                logger.warning("undetected-chromedriver unavailable (%s), falling back to Selenium Grid", e)
 
         # --- Fallback: Selenium Grid (remote) ---
-        options = webdriver.ChromeOptions()
-        if settings.SELENIUM_HEADLESS:
-            options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument(f"user-agent={user_agent}")
-        options.add_argument("--window-size=1920,1080")
-
-        # Extra stealth prefs
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
+        options = chrome_options(user_agent)
 
+        # Back-pressure: wait for a free node slot rather than queueing on the Grid
+        self._grid_slot = acquire_grid_slot()
         try:
-            logger.info(f"Connecting to Selenium Grid at {settings.SELENIUM_URL}")
+            logger.info("Connecting to Selenium Grid at %s", settings.SELENIUM_URL)
             self.driver = webdriver.Remote(
                 command_executor=settings.SELENIUM_URL,
                 options=options,
+                keep_alive=True,
             )
-            self.driver.implicitly_wait(settings.SELENIUM_TIMEOUT)
+            self._widen_command_pool()
+            self._set_timeouts()
 
             # Remove navigator.webdriver flag
-            self.driver.execute_cdp_cmd(
+            self._cdp(
                 "Page.addScriptToEvaluateOnNewDocument",
                 {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"},
             )
+            self._block_heavy_resources()
 
             logger.info("Successfully connected to Selenium Grid")
         except Exception as e:
-            logger.error(f"Failed to connect to Selenium Grid: {e}")
+            logger.error("Failed to connect to Selenium Grid: %s", e)
+            release_grid_slot(self._grid_slot)
+            self._grid_slot = None
             raise
         
     def _close_driver(self):
         """Close the WebDriver"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        try:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
+        finally:
+            self._waits.clear()
+            release_grid_slot(self._grid_slot)
+            self._grid_slot = None
     
     def login_linkedin(self, email: str, password: str) -> str:
         """
         Log in to LinkedIn and return the li_at cookie.
-        Raises Exception if login fails.
+        Raises Exception if login fails. Uses the applicator's browser if one
+        is already running (and leaves it open), otherwise starts and quits one.
         """
+        owns_driver = self.driver is None
         try:
-            self._init_driver()
+            if owns_driver:
+                self._init_driver()
             logger.info("Navigating to LinkedIn login page...")
             self.driver.get("https://www.linkedin.com/login")
             
             # Enter credentials
             logger.info("Entering credentials...")
-            email_elem = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "username"))
+            email_elem = self.wait.until(
+                EC.presence_of_element_located(_LOGIN_EMAIL)
             )
             email_elem.send_keys(email)
             
-            pass_elem = self.driver.find_element(By.ID, "password")
+            pass_elem = self.driver.find_element(*_LOGIN_PASSWORD)
             pass_elem.send_keys(password)
             
             # Submit
-            submit_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            submit_btn = self.driver.find_element(*_FORM_SUBMIT)
             submit_btn.click()
             
             # Wait for login to complete (check for feed or challenge)
             logger.info("Waiting for login completion...")
-            _human_delay(4.0, 7.0)  # realistic wait for redirects
+            try:
+                self._wait(15).until(_login_settled)
+            except TimeoutException:
+                pass  # fall through to the URL checks below
             
             # Check for security challenge (manual intervention needed)
             if "checkpoint" in self.driver.current_url or "challenge" in self.driver.current_url:
@@ -163,10 +802,11 @@ class JobApplicator:
                 raise Exception("Could not find li_at cookie after login.")
                 
         except Exception as e:
-            logger.error(f"LinkedIn login failed: {e}")
+            logger.error("LinkedIn login failed: %s", e)
             raise e
         finally:
-            self._close_driver()
+            if owns_driver:
+                self._close_driver()
 
     def _authenticate_linkedin(self, cookie_value: str = None):
         """Authenticate with LinkedIn using session cookie"""
@@ -176,39 +816,59 @@ class JobApplicator:
 
         try:
             logger.info("Authenticating with LinkedIn...")
-            self.driver.get("https://www.linkedin.com")
-            self.driver.add_cookie({
+            cookie = {
                 'name': 'li_at',
                 'value': cookie_value,
-                'domain': '.linkedin.com'
-            })
+                'domain': '.linkedin.com',
+                'path': '/',
+                'secure': True,
+                'httpOnly': True,
+            }
+            # CDP sets the cookie without a document on the origin; otherwise
+            # open LinkedIn's smallest page rather than the full homepage
+            if not self._cdp("Network.setCookie", cookie):
+                self.driver.get(_LINKEDIN_COOKIE_ORIGIN_URL)
+                self.driver.add_cookie(cookie)
             logger.info("LinkedIn cookie injected")
         except Exception as e:
-            logger.error(f"Failed to inject LinkedIn cookie: {e}")
+            logger.error("Failed to inject LinkedIn cookie: %s", e)
+
+    def _open(self, url: str):
+        """Navigate to url, stopping the load if it outlasts PAGE_LOAD_TIMEOUT"""
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            logger.info("Page load timed out for %s, continuing with partial page", url)
+            self.driver.execute_script("window.stop();")
+
+    def _click_with_retry(self, find, element=None) -> bool:
+        """
+        Click element (or whatever find() returns), re-finding it with a short
+        backoff if it goes stale mid-click. False if find() comes back empty
+        or every attempt hit a stale element.
+        """
+        for attempt in range(CLICK_ATTEMPTS):
+            if attempt:
+                time.sleep(CLICK_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            if element is None:
+                element = find()
+                if element is None:
+                    return False
+            try:
+                element.click()
+                return True
+            except StaleElementReferenceException:
+                element = None
+        return False
+
+    def _click_easy_apply(self) -> bool:
+        """Click Easy Apply, re-finding the button if it goes stale mid-click"""
+        return self._click_with_retry(self._find_easy_apply_button)
 
     def _find_easy_apply_button(self):
         """Find LinkedIn Easy Apply button using multiple selector strategies"""
-        selectors = [
-            # Most reliable: the button has a stable id
-            (By.ID, "jobs-apply-button-id"),
-            # aria-label contains "Easy Apply"
-            (By.XPATH, "//button[contains(@aria-label, 'Easy Apply')]"),
-            # Button class contains jobs-apply-button (CSS handles multi-class)
-            (By.CSS_SELECTOR, "button.jobs-apply-button"),
-            # Wrapper div class
-            (By.CSS_SELECTOR, ".jobs-apply-button--top-card button"),
-            # Text content fallback
-            (By.XPATH, "//button[.//span[contains(text(), 'Easy Apply')]]"),
-        ]
-        for by, selector in selectors:
-            try:
-                btn = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((by, selector))
-                )
-                return btn
-            except TimeoutException:
-                continue
-        return None
+        # One in-page wait across all strategies
+        return self._await_element(_EASY_APPLY_BUTTONS, WAIT_TIMEOUT)
 
     def apply_linkedin(self, job_url: str, user_profile: dict, resume_path: str,
                        ai_service=None, job_description: str = None, resume_text: str = None):
@@ -220,18 +880,15 @@ class JobApplicator:
             self._authenticate_linkedin(user_profile.get('linkedin_cookies'))
 
             log.append(f"Opening LinkedIn job: {job_url}")
-            self.driver.get(job_url)
-            _human_delay(2.5, 5.0)
+            self._open(job_url)
 
             # Click Easy Apply button
             log.append("Looking for Easy Apply button")
-            easy_apply_btn = self._find_easy_apply_button()
-            if not easy_apply_btn:
+            if not self._click_easy_apply():
                 log.append("Error: Could not find Easy Apply button")
                 return False, log
-            easy_apply_btn.click()
             log.append("Clicked Easy Apply")
-            _human_delay(1.5, 3.0)
+            self.wait.until(EC.presence_of_element_located(_EASY_APPLY_MODAL))
 
             # Fill application form
             log.append("Filling application form")
@@ -242,35 +899,20 @@ class JobApplicator:
 
             # Submit application — look for the final submit button
             log.append("Submitting application")
-            submitted = False
-            submit_selectors = [
-                (By.XPATH, "//button[contains(@aria-label, 'Submit application')]"),
-                (By.XPATH, "//button[contains(., 'Submit application')]"),
-                (By.XPATH, "//button[contains(@aria-label, 'Submit')]"),
-                (By.CSS_SELECTOR, "button[aria-label*='Submit']"),
-            ]
-            for by, selector in submit_selectors:
-                try:
-                    submit_btn = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((by, selector))
-                    )
-                    submit_btn.click()
-                    submitted = True
-                    break
-                except TimeoutException:
-                    continue
-
-            if not submitted:
+            submit_btn = self._await_element(_SUBMIT_BUTTONS, WAIT_TIMEOUT)
+            if submit_btn is None:
                 log.append("Error: Could not find Submit button")
                 return False, log
+            submit_btn.click()
 
-            _human_delay(2.0, 4.0)
+            # The modal swaps to a confirmation once the submission goes through
+            self._wait_for_staleness(submit_btn, 10)
             log.append("Application submitted successfully")
             return True, log
 
         except Exception as e:
             log.append(f"Error: {str(e)}")
-            logger.error(f"LinkedIn application error: {e}")
+            logger.error("LinkedIn application error: %s", e)
             return False, log
     
     def apply_indeed(self, job_url: str, user_profile: dict, resume_path: str):
@@ -279,14 +921,14 @@ class JobApplicator:
         
         try:
             log.append(f"Opening Indeed job: {job_url}")
-            self.driver.get(job_url)
-            _human_delay(2.0, 4.0)
+            self._open(job_url)
             
             # Click Apply Now button
             log.append("Looking for Apply button")
-            apply_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "indeedApplyButton"))
-            )
+            apply_btn = self._await_element(_INDEED_APPLY_BUTTONS, WAIT_TIMEOUT)
+            if apply_btn is None:
+                log.append("Error: Could not find Apply button")
+                return False, log
             apply_btn.click()
             log.append("Clicked Apply Now")
             
@@ -295,7 +937,7 @@ class JobApplicator:
             self._fill_indeed_form(user_profile, resume_path, log)
             
             # Submit
-            submit_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            submit_btn = self.driver.find_element(*_FORM_SUBMIT)
             submit_btn.click()
             
             log.append("Application submitted successfully")
@@ -303,7 +945,7 @@ class JobApplicator:
             
         except Exception as e:
             log.append(f"Error: {str(e)}")
-            logger.error(f"Indeed application error: {e}")
+            logger.error("Indeed application error: %s", e)
             return False, log
     
     def _handle_resume_step(self, resume_path: str, log: list):
@@ -313,208 +955,53 @@ class JobApplicator:
         1. If LinkedIn shows previously uploaded resumes, select the most recently used one.
         2. If no resumes are listed, upload from the portal via file input.
         """
-        from datetime import datetime as dt
-
-        # Check if LinkedIn's resume picker is showing (resume list items with radio buttons)
-        resume_items = self.driver.find_elements(
-            By.XPATH,
-            "//div[contains(@class, 'jobs-document-upload-redesign-card')]"
-                " | //div[contains(@class, 'ui-attachment')]"
-                " | //div[contains(@class, 'jobs-resume-picker')]"
-                " | //label[contains(@class, 'jobs-document-upload')]"
-        )
-
-        if not resume_items:
-            # Broader fallback: look for any list of resume cards with "Last used" text
-            resume_items = self.driver.find_elements(
-                By.XPATH,
-                "//*[contains(text(), 'Last used')]/.."
-            )
-
-        if resume_items:
-            log.append(f"Found {len(resume_items)} resume(s) on LinkedIn")
-
-            # Find which one is already selected (has active/checked radio)
-            already_selected = False
-            try:
-                selected = self.driver.find_element(
-                    By.XPATH,
-                    "//input[@type='radio' and @checked]"
-                        " | //input[@type='radio'][../..//div[contains(@class, 'selected')]]"
-                )
-                if selected:
-                    already_selected = True
-            except NoSuchElementException:
-                pass
-
-            # Parse "Last used on" dates to find the most recent resume
-            best_item = None
-            best_date = None
-
-            for item in resume_items:
-                try:
-                    text = item.text
-                    # Extract date from "Last used on M/D/YYYY" pattern
-                    if "Last used on" in text:
-                        date_str = text.split("Last used on")[-1].strip().split("\n")[0].strip()
-                        try:
-                            parsed = dt.strptime(date_str, "%m/%d/%Y")
-                        except ValueError:
-                            try:
-                                parsed = dt.strptime(date_str, "%m/%d/%y")
-                            except ValueError:
-                                parsed = None
-
-                        if parsed and (best_date is None or parsed > best_date):
-                            best_date = parsed
-                            best_item = item
-                except Exception:
-                    continue
-
-            if best_item:
-                # Click the most recently used resume to select it
-                try:
-                    # Try clicking the radio button or the card itself
-                    radio = best_item.find_element(By.XPATH, ".//input[@type='radio'] | .//button | .//label")
-                    radio.click()
-                except NoSuchElementException:
-                    best_item.click()
-                log.append(f"Selected most recently used resume (last used {best_date.strftime('%m/%d/%Y') if best_date else 'unknown'})")
-            elif already_selected:
+        # Read the whole resume picker (cards, "Last used" dates, current
+        # selection) in one call
+        picker = self.driver.execute_script(_RESUME_PICKER_JS, _RESUME_PICKER_PROBES)
+
+        if picker['count']:
+            log.append(f"Found {picker['count']} resume(s) on LinkedIn")
+
+            if picker['newest']:
+                # Click the most recently used resume (its radio, or the card itself)
+                picker['newest'].click()
+                log.append(f"Selected most recently used resume (last used {picker['newestDate']})")
+            elif picker['alreadySelected']:
                 log.append("Keeping pre-selected resume (latest already selected)")
             else:
                 # Just click the first resume item as fallback
-                try:
-                    first_radio = resume_items[0].find_element(By.XPATH, ".//input[@type='radio'] | .//button | .//label")
-                    first_radio.click()
-                except NoSuchElementException:
-                    resume_items[0].click()
+                picker['first'].click()
                 log.append("Selected first available resume")
             return
 
         # No resume picker shown — fall back to file upload
         if resume_path:
             try:
-                resume_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+                resume_input = self.driver.find_element(*_FILE_INPUT)
                 # Fix path: Selenium Chrome container mounts ./storage:/storage
                 selenium_path = resume_path.replace("/app/storage", "/storage")
                 resume_input.send_keys(selenium_path)
                 log.append(f"Uploaded resume via file input: {selenium_path}")
-                _human_delay(1.0, 2.0)
             except NoSuchElementException:
                 log.append("No file input found for resume upload")
         else:
             log.append("No resume path available and no LinkedIn resumes found")
 
     def _scrape_form_questions(self):
-        """Scrape all form questions from the current LinkedIn Easy Apply step."""
-        questions = []
-
-        # Handle select/dropdown questions
-        form_elements = self.driver.find_elements(
-            By.CSS_SELECTOR, "div[data-test-form-element]"
-        )
-        if not form_elements:
-            # Broader fallback
-            form_elements = self.driver.find_elements(
-                By.CSS_SELECTOR, ".fb-dash-form-element"
-            )
-
-        for idx, elem in enumerate(form_elements):
-            question_data = {'id': f'q{idx}', 'question': '', 'type': 'text', 'options': [], 'element': elem}
-
-            # Get question text from label
-            try:
-                label = elem.find_element(By.CSS_SELECTOR, "label span[aria-hidden='true'], label")
-                question_data['question'] = label.text.strip()
-            except NoSuchElementException:
-                try:
-                    label = elem.find_element(By.TAG_NAME, "label")
-                    question_data['question'] = label.text.strip()
-                except NoSuchElementException:
-                    continue
-
-            if not question_data['question']:
-                continue
-
-            # Detect element type and options
-            # Select dropdown
-            try:
-                select_el = elem.find_element(By.TAG_NAME, "select")
-                question_data['type'] = 'select'
-                question_data['select_element'] = select_el
-                options = select_el.find_elements(By.TAG_NAME, "option")
-                question_data['options'] = [
-                    o.get_attribute('value') for o in options
-                    if o.get_attribute('value') and o.get_attribute('value') != 'Select an option'
-                ]
-                questions.append(question_data)
-                continue
-            except NoSuchElementException:
-                pass
-
-            # Radio buttons
-            try:
-                radios = elem.find_elements(By.CSS_SELECTOR, "input[type='radio']")
-                if radios:
-                    question_data['type'] = 'radio'
-                    question_data['radio_elements'] = radios
-                    labels = elem.find_elements(By.CSS_SELECTOR, "label.fb-dash-form-element__label, label")
-                    # Get option labels (skip the question label itself)
-                    radio_labels = []
-                    for r in radios:
-                        r_id = r.get_attribute('id')
-                        if r_id:
-                            try:
-                                rl = elem.find_element(By.CSS_SELECTOR, f"label[for='{r_id}']")
-                                radio_labels.append(rl.text.strip())
-                            except NoSuchElementException:
-                                radio_labels.append(r.get_attribute('value') or '')
-                        else:
-                            radio_labels.append(r.get_attribute('value') or '')
-                    question_data['options'] = radio_labels
-                    questions.append(question_data)
-                    continue
-            except NoSuchElementException:
-                pass
-
-            # Checkbox
-            try:
-                checkboxes = elem.find_elements(By.CSS_SELECTOR, "input[type='checkbox']")
-                if checkboxes:
-                    question_data['type'] = 'checkbox'
-                    question_data['checkbox_elements'] = checkboxes
-                    questions.append(question_data)
-                    continue
-            except NoSuchElementException:
-                pass
-
-            # Text input
-            try:
-                text_input = elem.find_element(By.CSS_SELECTOR, "input[type='text'], input:not([type])")
-                question_data['type'] = 'text'
-                question_data['input_element'] = text_input
-                questions.append(question_data)
-                continue
-            except NoSuchElementException:
-                pass
-
-            # Textarea
-            try:
-                textarea = elem.find_element(By.TAG_NAME, "textarea")
-                question_data['type'] = 'text'
-                question_data['input_element'] = textarea
-                questions.append(question_data)
-                continue
-            except NoSuchElementException:
-                pass
-
-        return questions
+        """
+        Scrape all form questions from the current LinkedIn Easy Apply step.
+        The DOM walk runs in the page, so a step costs one round trip however
+        many questions it has; controls come back as WebElements.
+        """
+        return self.driver.execute_script(_SCRAPE_QUESTIONS_JS, _SCRAPE_SELECTORS) or []
 
     def _handle_additional_questions(self, ai_service, job_description: str,
-                                     resume_text: str, user_profile: dict, log: list):
-        """Use AI to answer form questions on the current step."""
-        questions = self._scrape_form_questions()
+                                     resume_text: str, user_profile: dict, log: list,
+                                     questions: list = None):
+        """Use AI to answer form questions on the current step (scraped here
+        unless the caller already has them)."""
+        if questions is None:
+            questions = self._scrape_form_questions()
         if not questions:
             log.append("No form questions found on this step")
             return
@@ -540,7 +1027,9 @@ class JobApplicator:
         else:
             log.append("No AI service available, using fallback answers")
 
-        # Apply answers to form elements
+        # Apply answers to form elements: every select, text input, radio and
+        # checkbox is collected and set together in one script call
+        fills = []
         for q in questions:
             answer = answers.get(q['id'])
             if not answer:
@@ -555,185 +1044,119 @@ class JobApplicator:
 
             try:
                 if q['type'] == 'select' and 'select_element' in q:
-                    sel = SeleniumSelect(q['select_element'])
-                    sel.select_by_value(answer)
-                    log.append(f"Selected '{answer}' for: {q['question'][:60]}")
+                    fills.append((q, q['select_element'], answer))
 
                 elif q['type'] == 'radio' and 'radio_elements' in q:
-                    # Click the radio whose value or label matches the answer
-                    clicked = False
-                    for radio in q['radio_elements']:
-                        val = radio.get_attribute('value') or ''
-                        if val == answer:
-                            radio.click()
-                            clicked = True
-                            break
-                    if not clicked and q['options']:
-                        # Match by option index
-                        for i, opt in enumerate(q['options']):
-                            if opt == answer and i < len(q['radio_elements']):
-                                q['radio_elements'][i].click()
-                                break
-                    log.append(f"Selected radio '{answer}' for: {q['question'][:60]}")
+                    # The radio whose value matches the answer, else its label
+                    choice = next(
+                        (r for r, val in zip(q['radio_elements'], q['radio_values']) if val == answer),
+                        None
+                    )
+                    if choice is None and answer in q['options']:
+                        i = q['options'].index(answer)
+                        if i < len(q['radio_elements']):
+                            choice = q['radio_elements'][i]
+                    if choice is not None:
+                        fills.append((q, choice, answer))
 
                 elif q['type'] == 'text' and 'input_element' in q:
-                    q['input_element'].clear()
-                    q['input_element'].send_keys(answer)
-                    log.append(f"Entered text for: {q['question'][:60]}")
+                    fills.append((q, q['input_element'], answer))
 
                 elif q['type'] == 'checkbox' and 'checkbox_elements' in q:
                     # If answer is truthy, check it
                     if answer.lower() in ('yes', 'true', '1'):
-                        for cb in q['checkbox_elements']:
-                            if not cb.is_selected():
-                                cb.click()
-                    log.append(f"Checked checkbox for: {q['question'][:60]}")
+                        for cb, checked in zip(q['checkbox_elements'], q['checkbox_checked']):
+                            if not checked:
+                                fills.append((q, cb, answer))
 
             except Exception as e:
                 log.append(f"Failed to fill '{q['question'][:40]}': {str(e)}")
 
+        if fills:
+            self._fill_fields(fills, log)
+
+    def _fill_fields(self, fills: list, log: list):
+        """Set text inputs and selects and click radios/checkboxes in a single
+        execute_script round trip."""
+        try:
+            failed = set(self.driver.execute_script(
+                _FILL_FIELDS_JS, [[element, str(answer)] for _, element, answer in fills]
+            ))
+        except Exception as e:
+            for q, _, _ in fills:
+                log.append(f"Failed to fill '{q['question'][:40]}': {str(e)}")
+            return
+
+        logged = set()
+        for i, (q, _, answer) in enumerate(fills):
+            if i in failed:
+                log.append(f"Failed to fill '{q['question'][:40]}': value '{answer}' not accepted")
+            elif q['id'] in logged:
+                continue  # one line per question, even with several checkboxes
+            elif q['type'] == 'select':
+                log.append(f"Selected '{answer}' for: {q['question'][:60]}")
+            elif q['type'] == 'radio':
+                log.append(f"Selected radio '{answer}' for: {q['question'][:60]}")
+            elif q['type'] == 'checkbox':
+                log.append(f"Checked checkbox for: {q['question'][:60]}")
+            else:
+                log.append(f"Entered text for: {q['question'][:60]}")
+            logged.add(q['id'])
+
     def _fill_linkedin_form(self, user_profile: dict, resume_path: str, log: list,
                             ai_service=None, job_description: str = None, resume_text: str = None):
         """Fill LinkedIn Easy Apply multi-step modal form"""
         max_steps = 10  # safety limit for multi-step forms
 
         for step in range(max_steps):
-            _human_delay(1.2, 2.5)
+            # Wait for the step to render, classify it (resume picker,
+            # questions, final step) and fill its phone inputs in one call
+            step_info = self._await_step(WAIT_TIMEOUT, phone=user_profile.get('phone'))
 
-            # Detect resume step: look for "Resume" heading or file input
-            is_resume_step = False
-            try:
-                self.driver.find_element(
-                    By.XPATH,
-                    "//h3[contains(text(), 'Resume')]"
-                        " | //span[contains(text(), 'Resume')]"
-                        " | //label[contains(text(), 'Resume')]"
-                )
-                is_resume_step = True
-            except NoSuchElementException:
-                # Also check if there's a file input or resume picker
-                try:
-                    self.driver.find_element(By.XPATH, "//*[contains(text(), 'Last used')]")
-                    is_resume_step = True
-                except NoSuchElementException:
-                    pass
+            is_resume_step = step_info['isResumeStep']
 
             if is_resume_step:
                 log.append(f"Resume step detected (step {step + 1})")
                 self._handle_resume_step(resume_path, log)
 
-            # Fill phone number if present
-            try:
-                phone_inputs = self.driver.find_elements(
-                    By.XPATH,
-                    "//input[contains(@id, 'phoneNumber') or contains(@name, 'phoneNumber')]"
-                )
-                for phone_input in phone_inputs:
-                    if phone_input.get_attribute('value') == '' and user_profile.get('phone'):
-                        phone_input.clear()
-                        phone_input.send_keys(user_profile['phone'])
-                        log.append("Phone number filled")
-            except NoSuchElementException:
-                pass
+            # Empty phone inputs were filled by the step script
+            if step_info['phoneFilled']:
+                log.append("Phone number filled")
 
             # Handle additional questions (selects, text inputs, radios, etc.)
-            # Detect by: "Additional Questions" heading, or form elements with selects/inputs
-            has_form_questions = False
-            try:
-                self.driver.find_element(
-                    By.XPATH,
-                    "//h3[contains(text(), 'Additional')]"
-                        " | //h3[contains(text(), 'Questions')]"
-                        " | //h3[contains(text(), 'Work Experience')]"
-                        " | //h3[contains(text(), 'Education')]"
-                )
-                has_form_questions = True
-            except NoSuchElementException:
-                # Also detect by presence of form elements (selects/inputs in the modal)
-                form_selects = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div[data-test-form-element] select, .fb-dash-form-element select"
-                )
-                form_inputs = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div[data-test-form-element] input[type='text'], "
-                    "div[data-test-form-element] textarea, "
-                    ".fb-dash-form-element input[type='text'], "
-                    ".fb-dash-form-element textarea"
-                )
-                form_radios = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div[data-test-form-element] input[type='radio'], "
-                    ".fb-dash-form-element input[type='radio']"
-                )
-                if form_selects or form_inputs or form_radios:
-                    has_form_questions = True
-
-            if has_form_questions and not is_resume_step:
+            # Detected by an "Additional Questions" style heading or form controls
+            if step_info['hasFormQuestions'] and not is_resume_step:
                 log.append(f"Additional questions detected (step {step + 1})")
                 self._handle_additional_questions(
-                    ai_service, job_description, resume_text, user_profile, log
+                    ai_service, job_description, resume_text, user_profile, log,
+                    questions=step_info['questions'],
                 )
-                _human_delay(0.8, 1.8)
 
             # Check if we reached the review/submit step
-            submit_selectors = [
-                "//button[contains(@aria-label, 'Submit application')]",
-                "//button[contains(., 'Submit application')]",
-                "//button[contains(@aria-label, 'Review')]",
-                "//button[contains(., 'Review')]",
-            ]
-            found_submit = False
-            for xpath in submit_selectors:
-                try:
-                    self.driver.find_element(By.XPATH, xpath)
-                    found_submit = True
-                    log.append(f"Reached final step at step {step + 1}")
-                    break
-                except NoSuchElementException:
-                    continue
-
-            if found_submit:
+            if step_info['isFinalStep']:
+                log.append(f"Reached final step at step {step + 1}")
                 # If it's a "Review" button, click it to get to the actual submit
-                try:
-                    review_btn = self.driver.find_element(
-                        By.XPATH,
-                        "//button[contains(@aria-label, 'Review') or contains(., 'Review')]"
-                    )
-                    review_btn.click()
+                if step_info['reviewButton'] is not None and self._click_with_retry(
+                    lambda: self._await_element(_REVIEW_BUTTONS, 2),
+                    element=step_info['reviewButton'],
+                ):
                     log.append("Clicked Review")
-                    _human_delay(1.2, 2.5)
-                except NoSuchElementException:
-                    pass
                 break
 
             # Click Next/Continue to advance to the next step
-            next_clicked = False
-            next_selectors = [
-                "//button[contains(@aria-label, 'Continue')]",
-                "//button[contains(@aria-label, 'Next')]",
-                "//button[contains(., 'Next')]",
-                "//span[text()='Next']/ancestor::button",
-            ]
-            for xpath in next_selectors:
-                try:
-                    next_btn = self.driver.find_element(By.XPATH, xpath)
-                    next_btn.click()
-                    log.append(f"Clicked Next (step {step + 1})")
-                    next_clicked = True
-                    break
-                except NoSuchElementException:
-                    continue
-
-            if not next_clicked:
+            if not self._click_with_retry(lambda: self._await_element(_NEXT_BUTTONS, 5)):
                 log.append(f"No Next/Continue/Submit button found at step {step + 1}")
                 break
+
+            log.append(f"Clicked Next (step {step + 1})")
+            # Don't inspect the next step until the current one is torn down
+            self._wait_for_staleness(step_info['heading'], 5)
     
     def _fill_indeed_form(self, user_profile: dict, resume_path: str, log: list):
         """Fill Indeed application form"""
         try:
             # Similar logic for Indeed
-            resume_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+            resume_input = self.driver.find_element(*_FILE_INPUT)
             resume_input.send_keys(resume_path)
             log.append("Resume uploaded")
             
@@ -745,22 +1168,75 @@ class JobApplicator:
             raise
 
     def _capture_screenshot(self, application_id: int):
-        """Capture screenshot and return URL"""
+        """Capture a screenshot into memory, queue the disk write and return its URL"""
         try:
             if self.driver:
-                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-                filename = f"application_{application_id}_{timestamp}.png"
-                storage_dir = "/app/storage/screenshots"
-                os.makedirs(storage_dir, exist_ok=True)
-                filepath = os.path.join(storage_dir, filename)
-                
-                self.driver.save_screenshot(filepath)
-                logger.info(f"Screenshot saved to {filepath}")
+                timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+                execute_cdp_cmd = getattr(self.driver, "execute_cdp_cmd", None)
+                if execute_cdp_cmd is not None:
+                    shot = execute_cdp_cmd(
+                        "Page.captureScreenshot",
+                        {"format": "jpeg", "quality": SCREENSHOT_JPEG_QUALITY},
+                    )
+                    image = base64.b64decode(shot["data"])
+                    filename = f"application_{application_id}_{timestamp}.jpg"
+                else:
+                    image = self.driver.get_screenshot_as_png()
+                    filename = f"application_{application_id}_{timestamp}.png"
+                _screenshot_writer.submit(_write_screenshot, os.path.join(SCREENSHOT_DIR, filename), image)
                 return f"/static/screenshots/{filename}"
         except Exception as e:
-            logger.error(f"Failed to capture screenshot: {e}")
+            logger.error("Failed to capture screenshot: %s", e)
         return None
 
+# Job sources JobApplicator can apply to
+APPLY_SOURCES = ("linkedin", "indeed")
+
+
+def _fail_without_browser(db, application, reason: str):
+    """Mark an application failed before any browser work was done"""
+    logger.info("Application %s failed without a browser: %s", application.id, reason)
+    application.status = ApplicationStatus.FAILED
+    application.error_message = reason
+    application.automation_log = [reason]
+    db.commit()
+
+
+def _local_resume_path(file_url):
+    """
+    Map a local-storage URL (/storage/...) to its path in this container
+    (/app/storage/...). S3 URLs have no local file, so they map to None.
+    """
+    if file_url and file_url.startswith("/storage/"):
+        return "/app" + file_url
+    return None
+
+
+def _set_application_status(db, application_id: int, status: ApplicationStatus, **values):
+    """
+    Write a claimed application's status with a fresh UPDATE by id, independent
+    of whatever ORM state the failed transaction left behind
+    """
+    try:
+        db.execute(
+            update(JobApplication)
+            .where(JobApplication.id == application_id)
+            .values(status=status, **values)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Could not set application %s to %s: %s", application_id, status, e)
+
+
+# An IN_PROGRESS claim older than Celery's task_time_limit belongs to a worker
+# that died or was killed; a redelivered message may take it over
+APPLY_CLAIM_STALE_AFTER = timedelta(seconds=30 * 60)
+
+# Runs the Gemini resume pick while the task thread boots the browser
+_resume_picker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-picker")
+
+
 def apply_to_job_task(application_id: int, user_id: int, job_id: int):
     """
     Background task to apply to a job
@@ -768,34 +1244,66 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
     """
     db = SessionLocal()
     applicator = None
+    application = None
+    claimed = 0
+    automation_started = False
     
     try:
-        # Get application, user, and job details
-        application = db.query(JobApplication).filter(
-            JobApplication.id == application_id
+        # Claim the application: only a PENDING row (or one left IN_PROGRESS by
+        # a dead worker) moves to IN_PROGRESS, so a redelivered or retried
+        # message can't drive a second real submission
+        claimed = db.execute(
+            update(JobApplication)
+            .where(
+                JobApplication.id == application_id,
+                JobApplication.user_id == user_id,
+                JobApplication.job_id == job_id,
+                or_(
+                    JobApplication.status == ApplicationStatus.PENDING,
+                    and_(
+                        JobApplication.status == ApplicationStatus.IN_PROGRESS,
+                        JobApplication.updated_at < func.now() - APPLY_CLAIM_STALE_AFTER,
+                    ),
+                ),
+            )
+            .values(status=ApplicationStatus.IN_PROGRESS)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            logger.warning("Application %s is not pending, skipping", application_id)
+            return
+        
+        # Application, job, user, profile and resumes in one round trip
+        # (a user has a single profile, so the joined collections stay small)
+        application = db.query(JobApplication).options(
+            joinedload(JobApplication.job),
+            joinedload(JobApplication.user).joinedload(User.profiles),
+            joinedload(JobApplication.user).joinedload(User.resumes),
+        ).filter(
+            JobApplication.id == application_id,
+            JobApplication.user_id == user_id,
+            JobApplication.job_id == job_id,
         ).first()
         
-        job = db.query(Job).filter(Job.id == job_id).first()
-        user = db.query(User).filter(User.id == user_id).first()
+        job = application.job if application else None
+        user = application.user if application else None
         
         if not all([application, job, user]):
-            logger.error(f"Missing data for application {application_id}")
+            logger.error("Missing data for application %s", application_id)
             return
         
-        # Update status to in progress
-        application.status = ApplicationStatus.IN_PROGRESS
-        db.commit()
-        
-        # Initialize applicator and AI service
-        applicator = JobApplicator()
-        applicator._init_driver()
+        # Nothing to automate: fail before resume selection and the browser
+        if job.source.value not in APPLY_SOURCES:
+            _fail_without_browser(db, application, f"Unsupported job source: {job.source.value}")
+            return
         
+        profile = user.profiles[0] if user.profiles else None
+
         # Get Gemini Key and initialize AI service (decrypt from DB)
-        gemini_key_enc = user.profiles[0].gemini_api_key if user.profiles else None
-        gemini_key = decrypt_value(gemini_key_enc) if gemini_key_enc else None
+        gemini_key_enc = profile.gemini_api_key if profile else None
+        gemini_key = _decrypt_cached(gemini_key_enc) if gemini_key_enc else None
         ai_service = None
 
-        from app.services.ai import AIService
         if gemini_key:
             ai_service = AIService(gemini_key, user_id=user_id)
 
@@ -804,7 +1312,17 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
         resume_path = None
         resume_text = None
 
-        if user.resumes and ai_service:
+        # Batch applies pick the resume up front (one Gemini call per batch)
+        preselected_resume = next(
+            (r for r in user.resumes if application.resume_used and r.file_url == application.resume_used),
+            None
+        )
+
+        if preselected_resume:
+            logger.info("Using preselected resume: %s", preselected_resume.file_name)
+            resume_text = preselected_resume.extracted_text
+            resume_path = _local_resume_path(preselected_resume.file_url)
+        elif user.resumes and ai_service:
             # Use AI to pick best resume
             resumes_data = [
                 {'id': r.id, 'extracted_text': r.extracted_text}
@@ -813,26 +1331,24 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
 
             if resumes_data:
                 logger.info("Using AI to select best resume...")
-                best_resume_id = ai_service.analyze_job_match(
-                    job.description,
-                    resumes_data
+                resume_pick = _resume_picker.submit(
+                    ai_service.analyze_job_match, job.description, resumes_data
                 )
+                # A LinkedIn apply needs the browser whatever resume is picked:
+                # start (or health-check) it while Gemini answers
+                if job.source.value == "linkedin":
+                    applicator = JobApplicator.for_worker()
+                best_resume_id = resume_pick.result()
 
                 selected_resume = next((r for r in user.resumes if r.id == best_resume_id), user.resumes[0])
-                logger.info(f"AI selected resume: {selected_resume.file_name}")
+                logger.info("AI selected resume: %s", selected_resume.file_name)
                 resume_text = selected_resume.extracted_text
-
-                # Construct local path from URL logic (assuming local storage)
-                resume_path = f"/app/storage/users/{user.id}/resume/{selected_resume.file_name}"
+                resume_path = _local_resume_path(selected_resume.file_url)
 
         if not resume_path:
             # Fallback to default
-            resume_url = application.resume_used or (
-                user.profiles[0].resume_url if user.profiles else None
-            )
-            if resume_url:
-                 filename = resume_url.split('/')[-1]
-                 resume_path = f"/app/storage/users/{user.id}/resume/{filename}"
+            resume_url = application.resume_used or (profile.resume_url if profile else None)
+            resume_path = _local_resume_path(resume_url)
 
         # Get resume text if not already set
         if not resume_text and user.resumes:
@@ -842,19 +1358,30 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
                     break
 
         # Get user profile with extra context for AI
-        profile = user.profiles[0] if user.profiles else None
         user_profile = {
             'phone': profile.phone if profile else None,
             'linkedin': profile.linkedin_url if profile else None,
-            'linkedin_cookies': decrypt_value(profile.linkedin_cookies) if profile and profile.linkedin_cookies else None,
+            'linkedin_cookies': _decrypt_cached(profile.linkedin_cookies) if profile and profile.linkedin_cookies else None,
             'location': profile.location if profile else None,
             'skills': profile.skills if profile else None,
             'experience_years': profile.experience_years if profile else None,
         }
 
-        # Apply based on job source
+        # Indeed can only apply by uploading a file; LinkedIn may still offer
+        # resumes stored on the account
+        if job.source.value == "indeed" and not resume_path:
+            _fail_without_browser(db, application, "No resume available to upload")
+            return
+
+        # Take the browser, reusing this worker's if it has one (a LinkedIn
+        # apply may already hold it from the resume selection above)
+        if applicator is None:
+            applicator = JobApplicator.for_worker()
+
+        # Apply based on job source. From here a retry could submit twice
         success = False
         log = []
+        automation_started = True
 
         if job.source.value == "linkedin":
             success, log = applicator.apply_linkedin(
@@ -863,15 +1390,13 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
                 job_description=job.description,
                 resume_text=resume_text,
             )
-        elif job.source.value == "indeed":
-            success, log = applicator.apply_indeed(job.source_url, user_profile, resume_path)
         else:
-            log.append(f"Unsupported job source: {job.source.value}")
+            success, log = applicator.apply_indeed(job.source_url, user_profile, resume_path)
         
         # Update application
         if success:
             application.status = ApplicationStatus.APPLIED
-            application.applied_at = datetime.utcnow()
+            application.applied_at = func.now()
         else:
             application.status = ApplicationStatus.FAILED
             application.error_message = "Application automation failed"
@@ -884,23 +1409,29 @@ def apply_to_job_task(application_id: int, user_id: int, job_id: int):
         application.automation_log = log
         db.commit()
         
-        logger.info(f"Application {application_id} processed: {application.status}")
+        logger.info("Application %s processed: %s", application_id, application.status)
         
     except Exception as e:
-        logger.error(f"Error in apply_to_job_task: {e}")
-        if application:
-            application.status = ApplicationStatus.FAILED
-            application.error_message = str(e)
-            
+        # The failure may have come from the final commit itself
+        db.rollback()
+        if isinstance(e, OperationalError) and not automation_started:
+            # Nothing was submitted yet: hand the claim back and let Celery retry
+            logger.warning("Database error on application %s, retrying: %s", application_id, e)
+            if claimed:
+                _set_application_status(db, application_id, ApplicationStatus.PENDING)
+            raise
+        
+        logger.error("Error in apply_to_job_task: %s", e)
+        if claimed:
+            values = {"error_message": str(e)}
             # Capture screenshot for exceptions
             if applicator:
-                screenshot_url = applicator._capture_screenshot(application.id)
+                screenshot_url = applicator._capture_screenshot(application_id)
                 if screenshot_url:
-                    application.screenshot_url = screenshot_url
-            
-            db.commit()
+                    values["screenshot_url"] = screenshot_url
+            _set_application_status(db, application_id, ApplicationStatus.FAILED, **values)
             
     finally:
         if applicator:
-            applicator._close_driver()
+            applicator.reset_session()
         db.close()
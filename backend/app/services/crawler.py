@@ -3,57 +3,175 @@ Job Crawler Service using Selenium
 Crawls job postings from various platforms
 """
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import OperationalError
 import logging
-import time
 import re
 import os
+import threading
+from urllib.parse import quote, urlencode
 
+from app.core.cache import invalidate_jobs_cache
+from app.core.chrome import chrome_options
 from app.core.config import settings
+from app.core.grid import acquire_grid_slot, refresh_grid_slot, release_grid_slot
 from app.core.database import SessionLocal
 from app.models.models import Job, CrawlerJob, JobSource
 
 logger = logging.getLogger(__name__)
 
+# Card locators for the count waits; field selectors are read in-page
+_LINKEDIN_CARD = (By.CLASS_NAME, "base-card")
+_INDEED_CARD = (By.CLASS_NAME, "job_seen_beacon")
+_LINKEDIN_FIELDS = {
+    "card": ".base-card",
+    "title": ".base-search-card__title",
+    "company": ".base-search-card__subtitle",
+    "location": ".job-search-card__location",
+    "link": "a",
+}
+_INDEED_FIELDS = {
+    "card": ".job_seen_beacon",
+    "title": ".jobTitle",
+    "company": ".companyName",
+    "location": ".companyLocation",
+    "link": ".jobTitle a",
+}
+
+# Reads every card's fields in one script call instead of four or five
+# find_element/text round trips per card. A missing field comes back null.
+_SCRAPE_CARDS_JS = """
+const [sel, limit] = arguments;
+const text = (card, css) => {
+    const el = card.querySelector(css);
+    return el ? el.innerText.trim() : null;
+};
+return Array.from(document.querySelectorAll(sel.card)).slice(0, limit).map(card => {
+    const link = card.querySelector(sel.link);
+    return {
+        title: text(card, sel.title),
+        company: text(card, sel.company),
+        location: text(card, sel.location),
+        link: link ? link.href : null,
+    };
+});
+"""
+
+_LINKEDIN_ID_RE = re.compile(r'/jobs/view/.*?(\d+)')
+_INDEED_ID_RE = re.compile(r'jk=([a-zA-Z0-9]+)')
+
+LINKEDIN_SEARCH_URL = "https://www.linkedin.com/jobs/search/"
+INDEED_SEARCH_URL = "https://www.indeed.com/jobs"
+
+MAX_CARDS = 20
+# LinkedIn appends roughly this many cards per scroll
+LINKEDIN_SCROLL_BATCH = 5
+CARD_WAIT_TIMEOUT = 10
+
+# One browser per worker process (thread), reused across crawl tasks so Chrome
+# startup is paid once rather than per crawl
+_CRAWLER_TLS = threading.local()
+
+
+def shutdown_worker_crawler():
+    """Quit this worker's cached crawler browser (worker process shutdown)."""
+    crawler = getattr(_CRAWLER_TLS, 'crawler', None)
+    _CRAWLER_TLS.crawler = None
+    if crawler:
+        try:
+            crawler._close_driver()
+        except Exception as e:
+            logger.warning(f"Failed to quit cached crawler WebDriver: {e}")
+
 
 class JobCrawler:
     """Crawls job postings from various platforms"""
+
+    @classmethod
+    def for_worker(cls) -> "JobCrawler":
+        """
+        Return this worker's crawler with a live browser, starting one only if
+        there's none cached or the cached session has died.
+        """
+        crawler = getattr(_CRAWLER_TLS, 'crawler', None)
+        if crawler and crawler.driver:
+            try:
+                crawler.driver.current_url  # cheap liveness probe
+                refresh_grid_slot(crawler._grid_slot)
+                return crawler
+            except Exception:
+                logger.warning("Cached crawler WebDriver session is gone, starting a new one")
+                shutdown_worker_crawler()
+
+        crawler = cls()
+        crawler._init_driver()
+        _CRAWLER_TLS.crawler = crawler
+        return crawler
+
+    def reset_session(self):
+        """Drop cookies and the open page so the next crawl starts clean;
+        quits the browser instead if it can't be reset."""
+        if not self.driver:
+            return
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+        except Exception as e:
+            logger.warning(f"Could not reset crawler WebDriver ({e}), discarding it")
+            if getattr(_CRAWLER_TLS, 'crawler', None) is self:
+                shutdown_worker_crawler()
+            else:
+                self._close_driver()
     
     def __init__(self):
         self.driver = None
+        self._grid_slot = None
         
     def _init_driver(self):
         """Initialize Selenium WebDriver"""
-        options = webdriver.ChromeOptions()
-        
-        if settings.SELENIUM_HEADLESS:
-            options.add_argument('--headless')
-        
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument(f'user-agent={settings.CRAWLER_USER_AGENT}')
+        options = chrome_options(settings.CRAWLER_USER_AGENT, for_crawl=True)
         
+        # Back-pressure: wait for a free node slot rather than queueing on the Grid
+        self._grid_slot = acquire_grid_slot()
         try:
             logger.info(f"Connecting to Selenium Grid at {settings.SELENIUM_URL}")
             self.driver = webdriver.Remote(
                 command_executor=settings.SELENIUM_URL,
                 options=options
             )
-            self.driver.implicitly_wait(settings.SELENIUM_TIMEOUT)
+            # Every wait is explicit; an implicit wait would stall each miss
+            self.driver.implicitly_wait(0)
             logger.info("Successfully connected to Selenium Grid")
         except Exception as e:
             logger.error(f"Failed to connect to Selenium Grid: {e}")
+            release_grid_slot(self._grid_slot)
+            self._grid_slot = None
             raise
         
     def _close_driver(self):
         """Close the WebDriver"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        try:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
+        finally:
+            release_grid_slot(self._grid_slot)
+            self._grid_slot = None
+
+    def _wait_for_cards(self, locator, count: int) -> int:
+        """Wait until at least `count` cards match `locator`; return how many do"""
+        try:
+            WebDriverWait(self.driver, CARD_WAIT_TIMEOUT).until(
+                lambda d: len(d.find_elements(*locator)) >= count
+            )
+        except TimeoutException:
+            pass
+        return len(self.driver.find_elements(*locator))
     
     def crawl_linkedin(self, search_query: str, location: str = None):
         """Crawl LinkedIn job postings"""
@@ -61,33 +179,31 @@ class JobCrawler:
         
         try:
             # Build LinkedIn search URL
-            base_url = "https://www.linkedin.com/jobs/search/"
-            params = f"?keywords={search_query.replace(' ', '%20')}"
+            params = {'keywords': search_query}
             if location:
-                params += f"&location={location.replace(' ', '%20')}"
+                params['location'] = location
             
-            url = base_url + params
+            url = f"{LINKEDIN_SEARCH_URL}?{urlencode(params, quote_via=quote)}"
             logger.info(f"Crawling LinkedIn: {url}")
             
             self.driver.get(url)
-            time.sleep(3)  # Wait for page load
             
-            # Scroll to load more jobs
-            for _ in range(3):
+            # Scroll to load more jobs until enough cards are in or the list stops growing
+            found = self._wait_for_cards(_LINKEDIN_CARD, 1)
+            while 0 < found < MAX_CARDS:
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                loaded = self._wait_for_cards(
+                    _LINKEDIN_CARD, min(MAX_CARDS, found + LINKEDIN_SCROLL_BATCH)
+                )
+                if loaded <= found:
+                    break
+                found = loaded
             
-            # Find job cards
-            job_cards = self.driver.find_elements(By.CLASS_NAME, "base-card")
-            
-            for card in job_cards[:20]:  # Limit to 20 jobs
-                try:
-                    job_data = self._parse_linkedin_card(card)
-                    if job_data:
-                        jobs.append(job_data)
-                except Exception as e:
-                    logger.warning(f"Error parsing LinkedIn job card: {e}")
-                    continue
+            # Read job cards
+            for card in self._scrape_cards(_LINKEDIN_FIELDS):
+                job_data = self._parse_linkedin_card(card)
+                if job_data:
+                    jobs.append(job_data)
             
             logger.info(f"Found {len(jobs)} jobs on LinkedIn")
             return jobs
@@ -102,28 +218,21 @@ class JobCrawler:
         
         try:
             # Build Indeed search URL
-            base_url = "https://www.indeed.com/jobs"
-            params = f"?q={search_query.replace(' ', '+')}"
+            params = {'q': search_query}
             if location:
-                params += f"&l={location.replace(' ', '+')}"
+                params['l'] = location
             
-            url = base_url + params
+            url = f"{INDEED_SEARCH_URL}?{urlencode(params)}"
             logger.info(f"Crawling Indeed: {url}")
             
             self.driver.get(url)
-            time.sleep(3)
-            
-            # Find job cards
-            job_cards = self.driver.find_elements(By.CLASS_NAME, "job_seen_beacon")
+            self._wait_for_cards(_INDEED_CARD, 1)
             
-            for card in job_cards[:20]:
-                try:
-                    job_data = self._parse_indeed_card(card)
-                    if job_data:
-                        jobs.append(job_data)
-                except Exception as e:
-                    logger.warning(f"Error parsing Indeed job card: {e}")
-                    continue
+            # Read job cards
+            for card in self._scrape_cards(_INDEED_FIELDS):
+                job_data = self._parse_indeed_card(card)
+                if job_data:
+                    jobs.append(job_data)
             
             logger.info(f"Found {len(jobs)} jobs on Indeed")
             return jobs
@@ -132,55 +241,37 @@ class JobCrawler:
             logger.error(f"Indeed crawl error: {e}")
             return jobs
     
-    def _parse_linkedin_card(self, card):
-        """Parse LinkedIn job card"""
-        try:
-            title = card.find_element(By.CLASS_NAME, "base-search-card__title").text
-            company = card.find_element(By.CLASS_NAME, "base-search-card__subtitle").text
-            location = card.find_element(By.CLASS_NAME, "job-search-card__location").text
-            link = card.find_element(By.TAG_NAME, "a").get_attribute("href")
-            
-            # Extract job ID from URL
-            job_id_match = re.search(r'/jobs/view/.*?(\d+)', link)
-            external_id = f"linkedin_{job_id_match.group(1)}" if job_id_match else None
-            
-            return {
-                'title': title,
-                'company': company,
-                'location': location,
-                'source_url': link,
-                'external_id': external_id,
-                'source': JobSource.LINKEDIN
-            }
-        except Exception as e:
-            logger.warning(f"Error parsing LinkedIn card: {e}")
+    def _scrape_cards(self, fields: dict) -> list:
+        """Title, company, location and link of the first MAX_CARDS cards"""
+        return self.driver.execute_script(_SCRAPE_CARDS_JS, fields, MAX_CARDS) or []
+
+    def _parse_card(self, card: dict, source: JobSource, id_re, id_prefix: str):
+        """Build job data from a scraped card; None if a field is missing"""
+        if any(card.get(key) is None for key in ('title', 'company', 'location', 'link')):
+            logger.warning(f"Skipping {source.value} card with missing fields: {card}")
             return None
+        
+        # Extract job ID from URL
+        link = card['link']
+        job_id_match = id_re.search(link)
+        external_id = f"{id_prefix}_{job_id_match.group(1)}" if job_id_match else None
+        
+        return {
+            'title': card['title'],
+            'company': card['company'],
+            'location': card['location'],
+            'source_url': link,
+            'external_id': external_id,
+            'source': source
+        }
     
-    def _parse_indeed_card(self, card):
+    def _parse_linkedin_card(self, card: dict):
+        """Parse LinkedIn job card"""
+        return self._parse_card(card, JobSource.LINKEDIN, _LINKEDIN_ID_RE, "linkedin")
+    
+    def _parse_indeed_card(self, card: dict):
         """Parse Indeed job card"""
-        try:
-            title_elem = card.find_element(By.CLASS_NAME, "jobTitle")
-            title = title_elem.text
-            link = title_elem.find_element(By.TAG_NAME, "a").get_attribute("href")
-            
-            company = card.find_element(By.CLASS_NAME, "companyName").text
-            location = card.find_element(By.CLASS_NAME, "companyLocation").text
-            
-            # Extract job ID from URL
-            job_id_match = re.search(r'jk=([a-zA-Z0-9]+)', link)
-            external_id = f"indeed_{job_id_match.group(1)}" if job_id_match else None
-            
-            return {
-                'title': title,
-                'company': company,
-                'location': location,
-                'source_url': link,
-                'external_id': external_id,
-                'source': JobSource.INDEED
-            }
-        except Exception as e:
-            logger.warning(f"Error parsing Indeed card: {e}")
-            return None
+        return self._parse_card(card, JobSource.INDEED, _INDEED_ID_RE, "indeed")
 
 
 def start_crawler_job(crawler_job_id: int, search_query: str, location: str, source: JobSource):
@@ -189,6 +280,8 @@ def start_crawler_job(crawler_job_id: int, search_query: str, location: str, sou
     This would typically be run by Celery worker
     """
     db = SessionLocal()
+    crawler_job = None
+    crawler = None
     
     try:
         # Update crawler job status
@@ -201,12 +294,11 @@ def start_crawler_job(crawler_job_id: int, search_query: str, location: str, sou
             return
         
         crawler_job.status = "running"
-        crawler_job.started_at = datetime.utcnow()
+        crawler_job.started_at = func.now()
         db.commit()
         
-        # Initialize crawler
-        crawler = JobCrawler()
-        crawler._init_driver()
+        # Take the browser, reusing this worker's if it has one
+        crawler = JobCrawler.for_worker()
         
         # Crawl based on source
         jobs_data = []
@@ -215,42 +307,39 @@ def start_crawler_job(crawler_job_id: int, search_query: str, location: str, sou
         elif source == JobSource.INDEED:
             jobs_data = crawler.crawl_indeed(search_query, location)
         
-        # Save jobs to database
+        # Save jobs in one statement; ones already stored are skipped by the
+        # unique external_id index
         jobs_saved = 0
-        for job_data in jobs_data:
-            try:
-                # Check if job already exists
-                existing = db.query(Job).filter(
-                    Job.external_id == job_data['external_id']
-                ).first()
-                
-                if not existing:
-                    new_job = Job(**job_data)
-                    db.add(new_job)
-                    jobs_saved += 1
-            except Exception as e:
-                logger.warning(f"Error saving job: {e}")
-                continue
-        
-        db.commit()
+        if jobs_data:
+            stmt = pg_insert(Job).values(jobs_data).on_conflict_do_nothing(
+                index_elements=["external_id"]
+            )
+            jobs_saved = db.execute(stmt).rowcount
         
         # Update crawler job
         crawler_job.status = "completed"
         crawler_job.jobs_found = jobs_saved
-        crawler_job.completed_at = datetime.utcnow()
+        crawler_job.completed_at = func.now()
         db.commit()
+        if jobs_saved:
+            invalidate_jobs_cache()
         
         logger.info(f"Crawler job {crawler_job_id} completed: {jobs_saved} jobs saved")
         
     except Exception as e:
         logger.error(f"Error in crawler job {crawler_job_id}: {e}")
+        # The failure may have come from the batch insert itself
+        db.rollback()
+        if isinstance(e, OperationalError):
+            # Re-crawling is safe (the insert skips stored jobs): let Celery retry
+            raise
         if crawler_job:
             crawler_job.status = "failed"
             crawler_job.error_message = str(e)
-            crawler_job.completed_at = datetime.utcnow()
+            crawler_job.completed_at = func.now()
             db.commit()
             
     finally:
         if crawler:
-            crawler._close_driver()
+            crawler.reset_session()
         db.close()
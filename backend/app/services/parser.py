@@ -1,28 +1,108 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
 import os
-import pypdf
+import re
+import pypdfium2 as pdfium
 import docx
 import logging
-from fastapi import UploadFile
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-async def extract_text_from_file(file_path: str, file_type: str) -> str:
+PDF_CONTENT_TYPE = "application/pdf"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Parsing and cleanup are CPU work (and PDFium is not thread-safe), so they run
+# in a small process pool rather than a thread. Spawned (not forked) children
+# only import this module, never the app or its event loop.
+PARSER_PROCESSES = int(os.environ.get("PARSER_PROCESSES", "2"))
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+
+_INLINE_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=PARSER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _cpu_pool
+
+
+def shutdown_cpu_pool():
+    """Stop the parser processes (called on app shutdown)."""
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+
+
+def _extract_text(stream, file_type: str, file_name: str) -> str:
+    """Extract text from a PDF or DOCX file-like object."""
+    parts = []
+    if file_type == PDF_CONTENT_TYPE or file_name.lower().endswith(".pdf"):
+        pdf = pdfium.PdfDocument(stream)
+        try:
+            for page in pdf:
+                parts.append(page.get_textpage().get_text_range())
+        finally:
+            pdf.close()
+
+    elif file_type == DOCX_CONTENT_TYPE or file_name.lower().endswith(".docx"):
+        doc = docx.Document(stream)
+        parts = [para.text for para in doc.paragraphs]
+
+    return "\n".join(parts).strip()
+
+
+def preprocess_resume(text: str) -> str:
+    """
+    Normalize extracted resume text before it's stored and sliced into prompts:
+    collapse runs of spaces, duplicated adjacent lines and excess blank lines,
+    so the prompt budget goes to actual content.
+    """
+    lines = []
+    for line in text.split("\n"):
+        line = _INLINE_WHITESPACE_RE.sub(" ", line).strip()
+        if line and lines and lines[-1] == line:
+            continue
+        lines.append(line)
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _extract_and_preprocess(contents: bytes, file_type: str, file_name: str) -> str:
+    return preprocess_resume(_extract_text(io.BytesIO(contents), file_type, file_name))
+
+
+async def extract_text_from_bytes(contents: bytes, file_type: str, file_name: str = "") -> str:
+    """
+    Extract text from in-memory PDF or DOCX contents.
+    Parsing is CPU-bound, so it runs in the parser process pool.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_cpu_pool(), _extract_and_preprocess, contents, file_type, file_name
+        )
+    except Exception as e:
+        logger.error(f"Failed to extract text from {file_name or file_type}: {e}")
+        return ""
+
+
+async def extract_text_from_file(fileobj, file_type: str, file_name: str = "") -> str:
     """
-    Extract text from PDF or DOCX file.
+    Extract text from a seekable file object (e.g. a spooled upload).
+    Contents are bounded by MAX_FILE_SIZE and shipped to the parser pool.
     """
-    text = ""
     try:
-        if file_type == "application/pdf" or file_path.lower().endswith(".pdf"):
-            reader = pypdf.PdfReader(file_path)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        
-        elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" or file_path.lower().endswith(".docx"):
-            doc = docx.Document(file_path)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        
-        return text.strip()
+        fileobj.seek(0)
+        contents = await asyncio.to_thread(fileobj.read)
     except Exception as e:
-        logger.error(f"Failed to extract text from {file_path}: {e}")
+        logger.error(f"Failed to read {file_name or file_type}: {e}")
         return ""
+    return await extract_text_from_bytes(contents, file_type, file_name)
@@ -2,10 +2,12 @@
 File Storage Service
 Handles file uploads to S3 or local storage
 """
+import asyncio
 import boto3
 from botocore.exceptions import ClientError
 import logging
 import os
+import shutil
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
 import uuid
@@ -14,6 +16,8 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+COPY_CHUNK_SIZE = 1 << 20  # 1MB
+
 
 class StorageService:
     """Handle file storage operations"""
@@ -37,34 +41,33 @@ class StorageService:
         Upload file to storage
         Returns: URL or path to the uploaded file
         """
-        # Validate file size
-        contents = await file.read()
-        if len(contents) > settings.MAX_FILE_SIZE:
+        # Stream from the spooled upload instead of materializing it in memory
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=400,
                 detail=f"File size exceeds maximum allowed ({settings.MAX_FILE_SIZE} bytes)"
             )
         
-        # Generate unique filename
         file_extension = Path(file.filename).suffix
         unique_filename = f"{user_id}/{file_type}/{uuid.uuid4()}{file_extension}"
         
+        await file.seek(0)
         if self.use_s3:
-            return await self._upload_to_s3(contents, unique_filename, file.content_type)
+            return await self._stream_to_s3(file.file, unique_filename, file.content_type)
         else:
-            return await self._upload_to_local(contents, unique_filename)
+            return await self._stream_to_local(file.file, unique_filename)
     
-    async def _upload_to_s3(self, contents: bytes, filename: str, content_type: str) -> str:
-        """Upload file to S3"""
+    async def _stream_to_s3(self, fileobj, filename: str, content_type: str) -> str:
+        """Stream a file object to S3 (multipart for large files) off the event loop"""
         try:
-            self.s3_client.put_object(
-                Bucket=settings.S3_BUCKET,
-                Key=filename,
-                Body=contents,
-                ContentType=content_type
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                fileobj,
+                settings.S3_BUCKET,
+                filename,
+                ExtraArgs={"ContentType": content_type}
             )
             
-            # Generate URL
             url = f"https://{settings.S3_BUCKET}.s3.{settings.S3_REGION}.amazonaws.com/{filename}"
             logger.info(f"Uploaded file to S3: {url}")
             return url
@@ -73,16 +76,16 @@ class StorageService:
             logger.error(f"S3 upload error: {e}")
             raise HTTPException(status_code=500, detail="File upload failed")
     
-    async def _upload_to_local(self, contents: bytes, filename: str) -> str:
-        """Upload file to local storage"""
+    def _copy_to_local(self, fileobj, file_path: Path):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "wb") as f:
+            shutil.copyfileobj(fileobj, f, COPY_CHUNK_SIZE)
+    
+    async def _stream_to_local(self, fileobj, filename: str) -> str:
+        """Copy a file object to local storage in 1MB chunks off the event loop"""
         try:
-            file_path = self.local_storage_path / filename
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(file_path, "wb") as f:
-                f.write(contents)
+            await asyncio.to_thread(self._copy_to_local, fileobj, self.local_storage_path / filename)
             
-            # Return relative path
             url = f"/storage/{filename}"
             logger.info(f"Uploaded file locally: {url}")
             return url
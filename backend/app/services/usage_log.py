@@ -0,0 +1,83 @@
+"""
+Batched AI usage logging
+
+Rows are queued in-process and written by a background thread in batches,
+so callers never wait on a DB round-trip or commit.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.database import SessionLocal
+from app.models.models import AIUsageLog
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 500
+_FLUSH_INTERVAL = 0.2  # seconds to keep collecting after the first queued row
+
+_usage_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def log_usage(row: Dict[str, Any]):
+    """Queue an AIUsageLog row for the background writer (non-blocking)."""
+    _ensure_writer()
+    _usage_queue.put_nowait(row)
+
+
+def _ensure_writer():
+    """Start the writer thread lazily, so each forked worker process gets its own."""
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name="ai-usage-writer", daemon=True)
+            _writer.start()
+
+
+def _writer_loop():
+    while True:
+        rows = [_usage_queue.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL
+        while len(rows) < _BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                rows.append(_usage_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        _write(rows)
+
+
+def _write(rows: List[Dict[str, Any]]):
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(AIUsageLog, rows)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to log AI usage ({len(rows)} rows): {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def flush_usage_logs():
+    """Write whatever is still queued. Called on process shutdown."""
+    rows = []
+    while True:
+        try:
+            rows.append(_usage_queue.get_nowait())
+        except queue.Empty:
+            break
+    if rows:
+        _write(rows)
+
+
+atexit.register(flush_usage_logs)
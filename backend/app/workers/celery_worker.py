@@ -2,7 +2,13 @@
 Celery Worker Configuration
 """
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy.exc import OperationalError
 from app.core.config import settings
+from app.core.log_queue import start_queue_logging, stop_queue_logging
+
+APPLY_QUEUE = 'apply'
+CRAWL_QUEUE = 'crawl'
 
 # Create Celery app
 celery_app = Celery(
@@ -21,22 +27,67 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
-    worker_max_tasks_per_child=50,
+    # Browsers are recycled on their own (SELENIUM_MAX_APPS_PER_DRIVER), so
+    # the child itself only needs replacing for slow Python-side growth.
+    # The memory cap (KiB, worker process RSS only, not Chrome) catches the rest
+    worker_max_tasks_per_child=200,
+    worker_max_memory_per_child=800_000,
     worker_prefetch_multiplier=1,
+    worker_concurrency=settings.MAX_CONCURRENT_APPLICATIONS,
+    task_routes={
+        'apply_to_job': {'queue': APPLY_QUEUE},
+        'crawl_jobs': {'queue': CRAWL_QUEUE},
+    },
 )
 
 # Import tasks
-from app.services.crawler import start_crawler_job
-from app.services.applicator import apply_to_job_task
+from app.services.crawler import shutdown_worker_crawler, start_crawler_job
+from app.services.applicator import apply_to_job_task, flush_screenshot_writes, shutdown_worker_driver
+from app.services.usage_log import flush_usage_logs
+
+
+@worker_process_init.connect
+def _start_queue_logging(**kwargs):
+    """Each pool child gets its own log writer thread"""
+    start_queue_logging()
+
+
+@worker_process_shutdown.connect
+def _flush_usage_logs_on_shutdown(**kwargs):
+    """Pool children may exit without running atexit hooks"""
+    flush_usage_logs()
+
+
+@worker_process_shutdown.connect
+def _quit_worker_driver(**kwargs):
+    """Quit the browsers this pool child kept open across tasks"""
+    shutdown_worker_driver()
+    shutdown_worker_crawler()
+    flush_screenshot_writes()
+    stop_queue_logging()
+
 
 # Register tasks
-@celery_app.task(name='crawl_jobs')
+@celery_app.task(
+    name='crawl_jobs',
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    max_retries=3,
+    retry_backoff=True,
+)
 def crawl_jobs_task(crawler_job_id, search_query, location, source):
     """Celery task for crawling jobs"""
     return start_crawler_job(crawler_job_id, search_query, location, source)
 
 
-@celery_app.task(name='apply_to_job')
+@celery_app.task(
+    name='apply_to_job',
+    acks_late=True,
+    autoretry_for=(OperationalError,),
+    max_retries=3,
+    retry_backoff=True,
+    rate_limit='10/s',
+)
 def apply_to_job_celery_task(application_id, user_id, job_id):
     """Celery task for applying to jobs"""
     return apply_to_job_task(application_id, user_id, job_id)
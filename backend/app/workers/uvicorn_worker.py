@@ -0,0 +1,10 @@
+"""
+Gunicorn worker class for the API
+"""
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopWorker(UvicornWorker):
+    """Uvicorn worker pinned to the uvloop event loop and httptools parser
+    instead of "auto", so a missing extension fails loudly at boot."""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
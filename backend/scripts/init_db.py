@@ -0,0 +1,25 @@
+"""
+Create or upgrade the database schema by running the Alembic migrations, so a
+database set up this way is stamped and later `alembic upgrade head` runs
+apply cleanly.
+
+Usage (from backend/): python -m scripts.init_db
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def init_db():
+    """Apply every pending migration"""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date")